@@ -0,0 +1,268 @@
+"""
+Load benchmark for every blueprint endpoint.
+
+Seeds a throwaway SQLite database with synthetic users, courses and enrollments,
+drives each endpoint through the Flask test client and/or a threaded WSGI server,
+and reports latency percentiles, throughput and SQL statements per request as JSON.
+
+    python -m benchmarks.run --scale 10000 --scale 100000 --output results.json
+    python -m benchmarks.run --scale 10000 --baseline benchmarks/baseline.json
+    python -m benchmarks.run --scale 10000 --baseline benchmarks/baseline.json --save-baseline
+
+With --baseline the run exits with status 1 when a scenario regressed by more than
+--tolerance (p95 latency or throughput) or issues more SQL statements per request.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event, insert
+
+from src import create_app
+from src.extensions import db
+from src.models.user import User
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+
+ENROLLMENTS_PER_USER = 10
+COURSES = 100
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def seed(app, scale, batch_size=10000):
+    """
+    Insert `scale` enrollments spread over scale / 10 users and 100 courses.
+    """
+    users = max(1, scale // ENROLLMENTS_PER_USER)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Course.__table__), [
+            {'name': f'Course {i}', 'description': f'Synthetic course {i}'} for i in range(COURSES)
+        ])
+        for start in range(0, users, batch_size):
+            db.session.execute(insert(User.__table__), [
+                {'username': f'user{i}', 'email': f'user{i}@example.com'}
+                for i in range(start, min(start + batch_size, users))
+            ])
+
+        rows = []
+        for user_id in range(1, users + 1):
+            for k in range(ENROLLMENTS_PER_USER):
+                rows.append({'user_id': user_id, 'course_id': (user_id * 7 + k) % COURSES + 1})
+                if len(rows) == batch_size:
+                    db.session.execute(insert(Enrollment.__table__), rows)
+                    rows = []
+        if rows:
+            db.session.execute(insert(Enrollment.__table__), rows)
+        db.session.commit()
+    return users
+
+
+def scenarios(users):
+    """
+    (name, method, path factory, json body factory) for each endpoint under test.
+    """
+    rand = random.Random(42)
+    return [
+        ('login', 'POST', lambda: '/login', lambda: {'username': f'user{rand.randrange(users)}'}),
+        ('users_page', 'GET', lambda: f'/users?limit=100&after={rand.randrange(users)}', None),
+        ('users_full', 'GET', lambda: '/users', None),
+        ('courses', 'GET', lambda: '/courses', None),
+        ('enroll', 'POST', lambda: '/enroll',
+         lambda: {'user_id': rand.randrange(1, users + 1), 'course_id': rand.randrange(1, COURSES + 1)}),
+        ('user_enrollments', 'GET', lambda: f'/enrollments/{rand.randrange(1, users + 1)}', None),
+    ]
+
+
+def summarize(latencies, elapsed, queries):
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 3)
+
+    return {
+        'requests': len(latencies),
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'queries_per_request': round(queries / len(latencies), 2),
+    }
+
+
+def run_test_client(app, token, scenario, requests):
+    name, method, path, body = scenario
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        response = client.open(path(), method=method, json=body() if body else None, headers=headers)
+        latencies.append(time.perf_counter() - t0)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{name}: {response.status_code} {response.get_data(as_text=True)[:200]}')
+    return latencies, time.perf_counter() - started
+
+
+def run_server(base_url, token, scenario, requests, concurrency):
+    name, method, path, body = scenario
+
+    def call(_):
+        data = json.dumps(body()).encode() if body else None
+        request = urllib.request.Request(base_url + path(), data=data, method=method, headers={
+            'Authorization': f'Bearer {token}', 'Content-Type': 'application/json',
+        })
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        return time.perf_counter() - t0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(call, range(requests)))
+    return latencies, time.perf_counter() - started
+
+
+def start_server(app):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def benchmark_scale(scale, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(tmp, "bench.db")}',
+            'ADMISSION_ENABLED': False,  # measure the app, not the rate limiter
+        })
+        t0 = time.perf_counter()
+        users = seed(app, scale)
+        seed_seconds = time.perf_counter() - t0
+
+        with app.app_context():
+            counter = QueryCounter(db.engine)
+        token = app.test_client().post('/login', json={'username': 'user0'}).json['access_token']
+
+        results = {'seed_seconds': round(seed_seconds, 2)}
+        for driver in args.drivers:
+            server, base_url = start_server(app) if driver == 'server' else (None, None)
+            results[driver] = {}
+            try:
+                for scenario in scenarios(users):
+                    if args.scenarios and scenario[0] not in args.scenarios:
+                        continue
+                    counter.count = 0
+                    if driver == 'server':
+                        latencies, elapsed = run_server(base_url, token, scenario, args.requests, args.concurrency)
+                    else:
+                        latencies, elapsed = run_test_client(app, token, scenario, args.requests)
+                    results[driver][scenario[0]] = summarize(latencies, elapsed, counter.count)
+                    print(f'[{scale}] {driver:<6} {scenario[0]:<17} {results[driver][scenario[0]]}', file=sys.stderr)
+            finally:
+                if server is not None:
+                    server.shutdown()
+
+        with app.app_context():
+            db.engine.dispose()
+        return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return a list of human readable regressions of `results` against `baseline`.
+    """
+    regressions = []
+    for scale, drivers in results['scales'].items():
+        for driver, scenario_results in drivers.items():
+            if not isinstance(scenario_results, dict):
+                continue
+            for name, current in scenario_results.items():
+                previous = baseline.get('scales', {}).get(scale, {}).get(driver, {}).get(name)
+                if previous is None:
+                    continue
+                label = f'{scale}/{driver}/{name}'
+                if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                    regressions.append(f"{label}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+                if current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+                    regressions.append(
+                        f"{label}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+                # Cache warm-up makes the count fractional; half a statement per request is a real change
+                if current['queries_per_request'] - previous['queries_per_request'] >= 0.5:
+                    regressions.append(
+                        f"{label}: queries/request {previous['queries_per_request']} -> {current['queries_per_request']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, action='append', help='Number of enrollments to seed (repeatable)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads for the server driver')
+    parser.add_argument('--driver', dest='drivers', action='append', choices=['client', 'server'])
+    parser.add_argument('--scenario', dest='scenarios', action='append', help='Only run these scenarios')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='Baseline JSON report to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Overwrite --baseline with this run')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression')
+    args = parser.parse_args(argv)
+    args.drivers = args.drivers or ['client', 'server']
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'requests_per_scenario': args.requests,
+            'concurrency': args.concurrency,
+        },
+        'scales': {str(scale): benchmark_scale(scale, args) for scale in (args.scale or [10000])},
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            f.write(output)
+    elif args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,31 @@
 import sys
 
 from flask import Flask
-from .extensions import db, migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
+from .extensions import db, migrate, principal_cache, response_cache
 from .config import Config
-from flask_jwt_extended import JWTManager
+from .database import engine_options, install_sqlite_pragmas
+from .routing import REPLICA_BIND, replica_health
+from .commands import (
+    check_enrollment_stats_command, import_command, rebuild_change_log_command, rebuild_enrollment_stats_command,
+    rebuild_search_index_command,
+)
+from .metrics import metrics
+from .admission import admission
+from .compression import compression
+from .profiling import profiler
+from .services.auth_service import auth_service
+from .services.write_queue import write_queue
 
 from .controllers.auth_controller import auth_bp
 from .controllers.user_controller import user_bp
 from .controllers.course_controller import course_bp
 from .controllers.enrollment_controller import enrollment_bp
+from .controllers.metrics_controller import metrics_bp
+from .controllers.stats_controller import stats_bp
+from .controllers.export_controller import export_bp
+from .controllers.batch_controller import batch_bp
+from .controllers.changes_controller import changes_bp
 
 def create_app(test_config=None):
     app = Flask(__name__)
@@ -18,18 +35,57 @@ def create_app(test_config=None):
     if test_config:
         app.config.update(test_config)  # Override with test-specific config
 
-    app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI    
+    # Explicit SQLALCHEMY_ENGINE_OPTIONS take precedence over the DB_* settings
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
     
+    if app.config.get('TRUSTED_PROXY_COUNT'):
+        # request.remote_addr becomes the client address the proxies forwarded
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_COUNT'])
+
+    if app.config.get('REPLICA_DATABASE_URI'):
+        app.config['SQLALCHEMY_BINDS'] = {
+            **app.config.get('SQLALCHEMY_BINDS', {}),
+            REPLICA_BIND: app.config['REPLICA_DATABASE_URI'],
+        }
+
     db.init_app(app)
+    # The replica mirrors the primary's tables and has no models of its own; drop the empty
+    # metadata Flask-SQLAlchemy registers for every bind so create_all/drop_all skip it
+    db.metadatas.pop(REPLICA_BIND, None)
+    replica_health.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            install_sqlite_pragmas(engine, app.config)
     migrate.init_app(app, db)
+    principal_cache.init_app(app)
+    response_cache.init_app(app)
+    metrics.init_app(app)
+    admission.init_app(app)  # after metrics, so shed requests are still measured
+    compression.init_app(app)
+    profiler.init_app(app)
+    write_queue.init_app(app)
     
-    # Initialize JWT manager
-    jwt = JWTManager(app)
+    # Bind the shared auth service (JWT manager and token blocklist)
+    auth_service.init_app(app)
 
     # Register the blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(user_bp)  
     app.register_blueprint(course_bp)
     app.register_blueprint(enrollment_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(changes_bp)
+
+    app.cli.add_command(import_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(rebuild_enrollment_stats_command)
+    app.cli.add_command(check_enrollment_stats_command)
+    app.cli.add_command(rebuild_change_log_command)
 
     return app
\ No newline at end of file
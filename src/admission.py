@@ -0,0 +1,161 @@
+import math
+import threading
+import time
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+
+from .metrics import metrics
+
+# Blueprints that are never shed, so the service stays observable under load
+EXEMPT_BLUEPRINTS = frozenset({'metrics_bp'})
+
+# WSGI environ key marking a request that holds a concurrency slot
+ADMISSION_SLOT = 'app.admission_slot'
+
+
+class _TokenBucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, burst, now):
+        self.tokens = burst
+        self.updated = now
+
+
+class AdmissionController:
+    """
+    Rejects requests before they reach a view (and so before any database work).
+
+    Each blueprint in ADMISSION_RATE_LIMITS gets a token bucket per client, keyed on the
+    JWT identity when the request carries a valid access token and on the client IP
+    otherwise (e.g. /login). ADMISSION_MAX_CONCURRENT caps the requests in flight across
+    the process. Rate-limited requests get 429, shed requests get 503, both with Retry-After.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.limits = {}
+        self.max_concurrent = 0
+        self.max_keys = 0
+        self.in_flight = 0
+        self.shed = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault('ADMISSION_ENABLED', True)
+        self.limits = dict(app.config.setdefault('ADMISSION_RATE_LIMITS', {}))
+        self.max_concurrent = app.config.setdefault('ADMISSION_MAX_CONCURRENT', 64)
+        self.max_keys = app.config.setdefault('ADMISSION_MAX_KEYS', 100000)
+        self.in_flight = 0
+        self.shed = {}
+        self._buckets = {}
+        metrics.add_collector(self._samples)
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def _before_request(self):
+        blueprint = request.blueprint
+        if blueprint in EXEMPT_BLUEPRINTS:
+            return None
+
+        rejected = self.rate_limit()
+        if rejected is not None:
+            return rejected
+
+        with self._lock:
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                admitted = False
+            else:
+                self.in_flight += 1
+                admitted = True
+        if not admitted:
+            return self._reject(blueprint, 'overloaded', 'Server is busy', 503, 1)
+
+        # Kept on the request rather than `g`, which nested request contexts (POST /batch) share
+        request.environ[ADMISSION_SLOT] = True
+        return None
+
+    def rate_limit(self):
+        """
+        Charge the current request to its blueprint's token bucket. Returns a 429 response
+        if the client is over the limit, else None. POST /batch calls it for each
+        sub-request, since those skip the request hooks.
+        """
+        blueprint = request.blueprint
+        limit = self.limits.get(blueprint)
+        if not self.enabled or limit is None or blueprint in EXEMPT_BLUEPRINTS:
+            return None
+        wait = self._take(blueprint, self._client_key(), *limit)
+        if wait:
+            return self._reject(blueprint, 'rate_limited', 'Too many requests', 429, wait)
+        return None
+
+    def _teardown_request(self, exc):
+        if request.environ.pop(ADMISSION_SLOT, False):
+            with self._lock:
+                self.in_flight -= 1
+
+    def _client_key(self):
+        auth = request.headers.get('Authorization', '')
+        if auth.startswith('Bearer '):
+            try:
+                claims = decode_token(auth[len('Bearer '):])
+                return 'user', claims[current_app.config['JWT_IDENTITY_CLAIM']]
+            except (JWTExtendedException, PyJWTError, KeyError):
+                pass
+        return 'ip', request.remote_addr
+
+    def _take(self, blueprint, client, rate, burst):
+        """
+        Take one token from the client's bucket; return 0 if admitted, else seconds until a token is available.
+        """
+        key = (blueprint, client)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                bucket = self._buckets[key] = _TokenBucket(burst, now)
+            else:
+                bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return 0
+            return (1 - bucket.tokens) / rate if rate else 60
+
+    def _prune(self, now):
+        # Forget buckets that have had time to refill completely; they would start full anyway
+        for key, bucket in list(self._buckets.items()):
+            rate, burst = self.limits.get(key[0], (0, 0))
+            if not rate or bucket.tokens + (now - bucket.updated) * rate >= burst:
+                del self._buckets[key]
+
+    def _reject(self, blueprint, reason, message, status, retry_after):
+        with self._lock:
+            key = (blueprint or '', reason)
+            self.shed[key] = self.shed.get(key, 0) + 1
+        response = jsonify({'error': message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def _samples(self):
+        return [
+            ('admission_shed_requests_total', 'counter', 'Requests rejected by admission control.', [
+                ({'blueprint': blueprint, 'reason': reason}, count)
+                for (blueprint, reason), count in sorted(self.shed.items())
+            ]),
+            ('admission_in_flight_requests', 'gauge', 'Requests currently admitted.', [({}, self.in_flight)]),
+        ]
+
+
+admission = AdmissionController()
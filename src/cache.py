@@ -0,0 +1,129 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from .compression import gzip_bytes
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU cache whose entries expire after a time to live.
+    Size and TTL are read from the app config as `<prefix>_SIZE` and `<prefix>_TTL`;
+    a size of 0 disables caching.
+    """
+
+    def __init__(self, config_prefix, maxsize=1024, ttl=60):
+        self.config_prefix = config_prefix
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.maxsize = app.config.setdefault(f'{self.config_prefix}_SIZE', self.maxsize)
+        self.ttl = app.config.setdefault(f'{self.config_prefix}_TTL', self.ttl)
+        self.clear()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data)}
+
+
+class CachedBody:
+    __slots__ = ('version', 'body', 'etag', '_gzipped')
+
+    def __init__(self, version, body):
+        self.version = version
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._gzipped = None
+
+    def gzip(self, level):
+        """
+        The body gzip-compressed at `level`, computed on first use and kept with the entry.
+        """
+        gzipped = self._gzipped
+        if gzipped is None or gzipped[0] != level:
+            gzipped = self._gzipped = (level, gzip_bytes(self.body, level))
+        return gzipped[1]
+
+
+class ResponseCache:
+    """
+    Serialized response bodies keyed by name, each built at a version of its data.
+    The current versions live in the database (see models/cache_version.py), where
+    writers bump them in the same transaction as the change; callers read the version
+    and only get an entry built at exactly that version.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.clear()
+
+    def get(self, key, version):
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def set(self, key, entry):
+        """
+        Store `entry`, a CachedBody built from data read at `entry.version`, unless an
+        entry built at a later version is already cached.
+        """
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current.version <= entry.version:
+                self._entries[key] = entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,240 @@
+import csv
+import json
+import os
+import time
+from collections import Counter
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, text
+
+from .extensions import db
+from .database import insert_ignoring_duplicates
+from .models.user import User
+from .models.course import Course, SEARCH_INDEX_DDL
+from .models.enrollment import Enrollment
+from .services.stats_service import StatsService
+from .services.enrollment_service import EnrollmentService
+from .services.change_service import ChangeService
+from .services.course_service import CourseService
+
+
+def _read_rows(path, fmt):
+    """
+    Yield one dict per record of a CSV (with a header row) or NDJSON file,
+    reading the file lazily so memory use does not depend on its size.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _user_rows(records):
+    for record in records:
+        yield {'username': record['username'], 'email': record['email']}
+
+
+class _CourseFilter:
+    """
+    Drops course records whose name is already taken, in the database or earlier in
+    the file. Course has no unique key, so the name identifies a course here, as it
+    does in enrollment records.
+    """
+
+    def __init__(self):
+        self.duplicates = 0
+
+    def rows(self, records):
+        names = set(db.session.scalars(select(Course.name)))
+        for record in records:
+            if record['name'] in names:
+                self.duplicates += 1
+                continue
+            names.add(record['name'])
+            yield {'name': record['name'], 'description': record['description']}
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _EnrollmentResolver:
+    """
+    Maps username / course name references to ids, and checks raw ids against the
+    existing ones. The maps are loaded once with column-only queries, so resolving a
+    row never touches the database.
+    """
+
+    def __init__(self):
+        self._users = None
+        self._courses = None
+        self._user_ids = None
+        self._course_ids = None
+        self.unresolved = 0
+
+    def user_id(self, record):
+        if record.get('user_id'):
+            if self._user_ids is None:
+                self._user_ids = set(db.session.scalars(select(User.id)))
+            user_id = _parse_id(record['user_id'])
+            return user_id if user_id in self._user_ids else None
+        if self._users is None:
+            self._users = dict(db.session.execute(select(User.username, User.id)).all())
+        return self._users.get(record.get('username'))
+
+    def course_id(self, record):
+        if record.get('course_id'):
+            if self._course_ids is None:
+                self._course_ids = set(db.session.scalars(select(Course.id)))
+            course_id = _parse_id(record['course_id'])
+            return course_id if course_id in self._course_ids else None
+        if self._courses is None:
+            self._courses = dict(db.session.execute(select(Course.name, Course.id)).all())
+        return self._courses.get(record.get('course'))
+
+    def rows(self, records):
+        for record in records:
+            user_id, course_id = self.user_id(record), self.course_id(record)
+            if user_id is None or course_id is None:
+                self.unresolved += 1
+                continue
+            yield {'user_id': user_id, 'course_id': course_id}
+
+
+@click.command('import')
+@click.argument('kind', type=click.Choice(['users', 'courses', 'enrollments']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+              help='File format. Defaults to the file extension.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per INSERT and commit.')
+@with_appcontext
+def import_command(kind, path, fmt, batch_size):
+    """
+    Bulk import users, courses or enrollments from a CSV or NDJSON file.
+
+    Enrollment records reference users and courses either by id (user_id,
+    course_id) or by name (username, course). Rows that already exist are skipped;
+    courses count as existing when a course with the same name does.
+    """
+    fmt = fmt or ('csv' if os.path.splitext(path)[1].lower() == '.csv' else 'ndjson')
+    records = _read_rows(path, fmt)
+
+    resolver = course_filter = None
+    if kind == 'users':
+        stmt, rows = insert_ignoring_duplicates(User.__table__), _user_rows(records)
+    elif kind == 'courses':
+        course_filter = _CourseFilter()
+        stmt, rows = insert_ignoring_duplicates(Course.__table__), course_filter.rows(records)
+    else:
+        resolver = _EnrollmentResolver()
+        stmt = insert_ignoring_duplicates(Enrollment.__table__).returning(
+            Enrollment.course_id, Enrollment.enrollment_date,
+        )
+        rows = resolver.rows(records)
+
+    started = time.perf_counter()
+    read = inserted = 0
+    for batch in _batches(rows, batch_size):
+        # Core executemany: no ORM objects are built for the imported rows
+        result = db.session.execute(stmt, batch)
+        if resolver is not None:
+            # Count the new enrollments in the same transaction as the batch
+            created = result.all()
+            StatsService.record_enrollments(created)
+            # Imported enrollments hold seats, but capacity is not enforced on import
+            EnrollmentService.adjust_seats(Counter(row.course_id for row in created))
+            inserted += len(created)
+        else:
+            inserted += max(result.rowcount, 0)
+            if kind == 'courses' and result.rowcount:
+                CourseService.bump_catalog_version()
+        db.session.commit()
+        read += len(batch)
+
+    elapsed = time.perf_counter() - started
+    rate = read / elapsed if elapsed else 0
+    click.echo(f'Imported {inserted} of {read} {kind} in {elapsed:.2f}s ({rate:,.0f} rows/s)')
+    if course_filter is not None and course_filter.duplicates:
+        click.echo(f'Skipped {course_filter.duplicates} courses whose name already exists')
+    if resolver is not None and resolver.unresolved:
+        click.echo(f'Skipped {resolver.unresolved} enrollments with unknown users or courses')
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """
+    Create the course full-text index if it is missing (e.g. on a database created
+    by migrations) and rebuild it from the course table. SQLite only.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('The course search index requires SQLite (FTS5)')
+
+    for statement in SEARCH_INDEX_DDL:
+        db.session.execute(text(statement))
+    db.session.execute(text("INSERT INTO course_fts(course_fts) VALUES ('rebuild')"))
+    db.session.commit()
+    click.echo('Course search index rebuilt')
+
+
+@click.command('rebuild-enrollment-stats')
+@with_appcontext
+def rebuild_enrollment_stats_command():
+    """
+    Recompute the enrollment summary tables and course seat counts from the enrollment table.
+    """
+    StatsService.rebuild()
+    click.echo('Enrollment statistics rebuilt')
+
+
+@click.command('check-enrollment-stats')
+@with_appcontext
+def check_enrollment_stats_command():
+    """
+    Compare the enrollment summary tables with the enrollment table; exits with
+    status 1 if they disagree.
+    """
+    problems = StatsService.check()
+    for key, expected, recorded in problems['courses']:
+        click.echo(f'course {key}: {recorded} recorded, {expected} enrolled')
+    for key, expected, recorded in problems['daily']:
+        click.echo(f'day {key}: {recorded} recorded, {expected} enrolled')
+    for key, expected, recorded in problems['seats']:
+        click.echo(f'course {key}: {recorded} seats taken, {expected} enrolled')
+
+    if any(problems.values()):
+        raise click.ClickException('Enrollment statistics are out of date; run `flask rebuild-enrollment-stats`')
+    click.echo('Enrollment statistics are consistent')
+
+
+@click.command('rebuild-change-log')
+@with_appcontext
+def rebuild_change_log_command():
+    """
+    Create the change feed triggers if they are missing (e.g. on a database created
+    by migrations) and record existing rows so clients doing a full sync see them.
+    SQLite only.
+    """
+    if not ChangeService.is_supported():
+        raise click.ClickException('The change feed requires SQLite')
+
+    added = ChangeService.rebuild()
+    click.echo(f'Change log rebuilt ({added} rows added)')
@@ -0,0 +1,80 @@
+import zlib
+
+from flask import request
+
+# gzip container (as opposed to raw deflate or zlib) for zlib.compressobj
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def gzip_bytes(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _gzip_stream(chunks, level):
+    # Flush after every chunk so streamed responses keep streaming instead of waiting for a full block
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class Compression:
+    """
+    gzip-encodes responses for clients that send `Accept-Encoding: gzip`.
+
+    Buffered bodies are compressed when they reach COMPRESS_MIN_SIZE bytes; streamed
+    bodies are always compressed, chunk by chunk. A response built from a response-cache
+    entry (`response.cached_body`) reuses the entry's compressed copy, so a hot body is
+    compressed once per version.
+    """
+
+    def __init__(self):
+        self.level = 6
+        self.min_size = 1024
+        self.mimetypes = frozenset()
+
+    def init_app(self, app):
+        self.level = app.config.setdefault('COMPRESS_LEVEL', 6)
+        self.min_size = app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        self.mimetypes = frozenset(app.config.setdefault('COMPRESS_MIMETYPES', ['application/json']))
+        if app.config.setdefault('COMPRESS_ENABLED', True):
+            app.after_request(self._after_request)
+
+    def _after_request(self, response):
+        if response.mimetype not in self.mimetypes:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or not request.accept_encodings['gzip']):
+            return response
+
+        if response.is_streamed:
+            response.response = _gzip_stream(response.iter_encoded(), self.level)
+            response.headers.pop('Content-Length', None)
+        else:
+            cached = getattr(response, 'cached_body', None)
+            if cached is not None:
+                body = cached.gzip(self.level)
+            else:
+                data = response.get_data()
+                if len(data) < self.min_size:
+                    return response
+                body = gzip_bytes(data, self.level)
+            response.set_data(body)
+
+        response.headers['Content-Encoding'] = 'gzip'
+        etag, weak = response.get_etag()
+        if etag:
+            # The compressed bytes are a different representation and need their own validator
+            response.set_etag(f'{etag}-gzip', weak)
+            response.make_conditional(request)
+        return response
+
+
+compression = Compression()
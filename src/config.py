@@ -1,6 +1,100 @@
 import os
 
+
+def _optional_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _rate_limits(spec):
+    # 'blueprint=rate/burst,...' -> {blueprint: (requests per second, burst)}
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, value = item.partition('=')
+        rate, _, burst = value.partition('/')
+        limits[name.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'your_secret_key')
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///advwebdev.db'  # Or another DB URI
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///advwebdev.db')  # Or another DB URI
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Optional read replica; GET requests and read-only service methods read from it
+    REPLICA_DATABASE_URI = os.getenv('REPLICA_DATABASE_URL')
+    REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+
+    # Engine pooling; unset values keep SQLAlchemy's defaults (sizing is ignored for SQLite)
+    DB_POOL_SIZE = _optional_int('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = _optional_int('DB_MAX_OVERFLOW')
+    DB_POOL_RECYCLE = _optional_int('DB_POOL_RECYCLE')
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+    # PRAGMAs applied to every new SQLite connection
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -64000))  # negative means KiB
+    SQLITE_FOREIGN_KEYS = True  # needed for ON DELETE CASCADE
+
+    # Keyset pagination and streaming for list endpoints
+    API_DEFAULT_PAGE_SIZE = int(os.getenv('API_DEFAULT_PAGE_SIZE', 100))
+    API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 1000))
+    API_STREAM_BATCH_SIZE = int(os.getenv('API_STREAM_BATCH_SIZE', 1000))
+
+    # Upper bound on the number of items accepted by POST /enroll/batch
+    ENROLL_BATCH_MAX_ITEMS = int(os.getenv('ENROLL_BATCH_MAX_ITEMS', 5000))
+
+    # Upper bound on the number of sub-requests accepted by POST /batch
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 50))
+
+    # Per-process cache of authenticated users (LRU, entries expire after TTL seconds)
+    AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv('AUTH_PRINCIPAL_CACHE_SIZE', 10000))
+    AUTH_PRINCIPAL_CACHE_TTL = int(os.getenv('AUTH_PRINCIPAL_CACHE_TTL', 300))
+
+    # Request/SQL instrumentation exposed at /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_N_PLUS_ONE_THRESHOLD = int(os.getenv('METRICS_N_PLUS_ONE_THRESHOLD', 10))
+
+    # Seconds between reloads of token revocations made by other processes
+    BLOCKLIST_SYNC_INTERVAL = int(os.getenv('BLOCKLIST_SYNC_INTERVAL', 5))
+
+    # Default number of results for GET /courses/search
+    SEARCH_DEFAULT_LIMIT = int(os.getenv('SEARCH_DEFAULT_LIMIT', 20))
+
+    # Commit enrollment writes in groups from a single writer thread (see services/write_queue.py)
+    ENROLLMENT_GROUP_COMMIT = os.getenv('ENROLLMENT_GROUP_COMMIT', 'false').lower() == 'true'
+    GROUP_COMMIT_MAX_BATCH = int(os.getenv('GROUP_COMMIT_MAX_BATCH', 200))
+    GROUP_COMMIT_MAX_WAIT_MS = float(os.getenv('GROUP_COMMIT_MAX_WAIT_MS', 5))
+    GROUP_COMMIT_TIMEOUT = float(os.getenv('GROUP_COMMIT_TIMEOUT', 30))
+
+    # gzip for clients that accept it; buffered bodies below COMPRESS_MIN_SIZE bytes are sent as is
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_MIMETYPES = os.getenv('COMPRESS_MIMETYPES', 'application/json,application/x-ndjson,text/csv').split(',')
+
+    # Admission control: per-client token buckets per blueprint ('blueprint=rate/burst', rate in
+    # requests per second) and a cap on requests in flight; excess requests get 429/503
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_RATE_LIMITS = _rate_limits(os.getenv(
+        'ADMISSION_RATE_LIMITS', 'auth_bp=5/20,user_bp=50/100,course_bp=50/100,enrollment=50/100,stats_bp=10/20,export_bp=1/5,batch_bp=10/20,changes_bp=10/30',
+    ))
+    ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', 64))
+    ADMISSION_MAX_KEYS = int(os.getenv('ADMISSION_MAX_KEYS', 100000))
+
+    # Number of reverse proxies / load balancers in front of the app. Their X-Forwarded-For
+    # entries are trusted for the client address (which anonymous rate limits key on)
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+
+    # cProfile dumps (.pstats, plus a .sql file of the statements run) for requests sent with
+    # PROFILING_HEADER set to PROFILING_TOKEN, or sampled at PROFILING_SAMPLE_RATE; off by default
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_DIR = os.getenv('PROFILING_DIR')  # defaults to <instance path>/profiles
+    PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0.0))
+    PROFILING_HEADER = os.getenv('PROFILING_HEADER', 'X-Profile')
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN')
+    PROFILING_SQL = os.getenv('PROFILING_SQL', 'true').lower() == 'true'
+    PROFILING_MIN_DURATION_MS = int(os.getenv('PROFILING_MIN_DURATION_MS', 0))
@@ -1,19 +1,15 @@
 from flask import Blueprint, request, jsonify, abort
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity, jwt_required
 from ..models.user import User
-from ..services.auth_service import AuthService  # Import the AuthManager class
+from ..services.auth_service import auth_service
 
 auth_bp = Blueprint('auth_bp', __name__)
 
-auth_manager = AuthService()
-
 @auth_bp.route('/login', methods=['POST'])
 def login():
     # Logic for logging in a user and generating tokens
     data = request.get_json()
     username = data.get('username')
-    email = data.get('email')
-
-    print(f'username: {username}, email: {email}')
 
     # Authenticate the user
     # TODO: sanitize the input before querying the database
@@ -22,10 +18,27 @@ def login():
     if not user:
         return jsonify({'message': 'User not found!'}), 404
     
-    tokens = auth_manager.generate_tokens(user)
+    tokens = auth_service.generate_tokens(user)
 
     return jsonify(tokens), 200
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    # Exchange a valid refresh token for a new access token
+    current_user = auth_service.load_user(get_jwt_identity())
+    if not current_user:
+        return jsonify({'message': 'Invalid user!'}), 403
+
+    return jsonify({'access_token': create_access_token(identity=current_user.id)}), 200
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    # Revokes the token sent with the request; call once with each token to revoke both
+    auth_service.revoke_token(get_jwt())
+    return jsonify({'message': 'Token revoked'}), 200
+
 
 # # User login route to generate a JWT token
 # @auth_bp.route('/login', methods=['POST'])
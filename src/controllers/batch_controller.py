@@ -0,0 +1,90 @@
+from flask import Blueprint, request, jsonify, current_app, g
+from ..extensions import db
+from ..admission import admission
+from ..metrics import metrics
+from ..database import deferred_commits
+from ..services.auth_service import auth_service, BATCH_PRINCIPAL
+
+batch_bp = Blueprint('batch_bp', __name__)
+
+@batch_bp.route('/batch', methods=['POST'])
+@auth_service.token_required
+def run_batch(current_user):
+    # Runs a list of {method, path, body} sub-requests against the other endpoints in one round trip.
+    # Send {"requests": [...], "atomic": true} to run them in one transaction that is only
+    # committed if every sub-request succeeds.
+    data = request.get_json(silent=True)
+    atomic = False
+    if isinstance(data, dict):
+        atomic = bool(data.get('atomic', False))
+        data = data.get('requests')
+
+    if not isinstance(data, list) or not data:
+        return jsonify({'error': 'Expected a non-empty list of {method, path, body} sub-requests'}), 400
+    if len(data) > current_app.config['BATCH_MAX_REQUESTS']:
+        return jsonify({'error': f"At most {current_app.config['BATCH_MAX_REQUESTS']} sub-requests per batch"}), 400
+    for item in data:
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str) or not item['path'].startswith('/'):
+            return jsonify({'error': 'Every sub-request needs a path starting with /'}), 400
+
+    setattr(g, BATCH_PRINCIPAL, current_user)
+    try:
+        results = _run_atomic(data) if atomic else [_dispatch(item) for item in data]
+    finally:
+        g.pop(BATCH_PRINCIPAL, None)
+
+    failed = any(result['status'] >= 400 for result in results)
+    return jsonify(results), 207 if failed else 200
+
+def _run_atomic(items):
+    # Stop at the first failure and roll everything back; later sub-requests are not run
+    results = []
+    with deferred_commits() as session:
+        for item in items:
+            result = _dispatch(item)
+            results.append(result)
+            if result['status'] >= 400:
+                break
+
+    if len(results) == len(items) and results[-1]['status'] < 400:
+        session.commit()
+    else:
+        session.rollback()
+        results += [{'status': 424, 'body': {'error': 'Not run: an earlier sub-request failed'}}] * (len(items) - len(results))
+    return results
+
+def _dispatch(item):
+    """
+    Run one sub-request through the URL map and its view function, within the batch's
+    app context (and so its database session), skipping the per-request hooks. It is
+    still charged to its blueprint's rate limit and measured under its own endpoint.
+    """
+    method = str(item.get('method', 'GET')).upper()
+    headers = {'Authorization': request.headers['Authorization']} if 'Authorization' in request.headers else {}
+    with current_app.test_request_context(item['path'], method=method, json=item.get('body'), headers=headers,
+                                          environ_base={'REMOTE_ADDR': request.remote_addr}):
+        try:
+            response = metrics.measure_nested(_respond)
+        except Exception:
+            current_app.logger.exception('Batch sub-request %s %s failed', method, item['path'])
+            if not db.session.info.get('defer_commit'):
+                db.session.rollback()
+            return {'status': 500, 'body': {'error': 'Internal server error'}}
+
+        body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+        return {'status': response.status_code, 'body': body}
+
+def _respond():
+    try:
+        if request.routing_exception is not None:
+            raise request.routing_exception
+        if request.blueprint == batch_bp.name:
+            return current_app.make_response((jsonify({'error': 'Batches cannot be nested'}), 400))
+        rejected = admission.rate_limit()
+        if rejected is not None:
+            return rejected
+        rv = current_app.view_functions[request.endpoint](**request.view_args)
+    except Exception as e:
+        # Error handlers (HTTP errors, JWT errors) turn the exception into a response
+        rv = current_app.handle_user_exception(e)
+    return current_app.make_response(rv)
@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify, current_app
+from ..services.change_service import ChangeService, CHANGE_SERIALIZERS
+from ..services.auth_service import auth_service
+
+changes_bp = Blueprint('changes_bp', __name__)
+
+@changes_bp.route('/changes', methods=['GET'])
+@auth_service.token_required
+def get_changes(current_user):
+    # Inserts, updates and deletes of users, courses and enrollments after ?since=<cursor>.
+    # Start with since=0 for a full sync, then poll with the returned cursor; keep
+    # polling while has_more is true. ?entities=user,course limits the feed.
+    if not ChangeService.is_supported():
+        return jsonify({'error': 'The change feed requires SQLite'}), 501
+
+    try:
+        since = int(request.args.get('since', 0))
+        limit = int(request.args.get('limit', current_app.config['API_DEFAULT_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    if since < 0 or limit < 1:
+        return jsonify({'error': 'since must be non-negative and limit positive'}), 400
+    limit = min(limit, current_app.config['API_MAX_PAGE_SIZE'])
+
+    entities = [name for name in request.args.get('entities', '').split(',') if name]
+    unknown = set(entities) - CHANGE_SERIALIZERS.keys()
+    if unknown:
+        return jsonify({'error': f"Unknown entities: {', '.join(sorted(unknown))}"}), 400
+
+    changes = ChangeService.get_changes(since, limit + 1, entities)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    cursor = changes[-1]['version'] if changes else since
+    return jsonify({'changes': changes, 'cursor': cursor, 'has_more': has_more}), 200
@@ -1,25 +1,64 @@
-from flask import Blueprint, request, jsonify
-from ..services.course_service import CourseService
-from ..services.auth_service import AuthService
+from flask import Blueprint, request, jsonify, current_app
+from ..services.course_service import CourseService, CATALOG_CACHE_KEY
+from ..services.auth_service import auth_service
+from ..extensions import response_cache
+from ..cache import CachedBody
+from ..database import after_commit
+from ..serializers import course_serializer, course_seats_serializer
+from ..pagination import list_response, parse_page_args, paginated_response, stream_json_array, wants_stream
 
 course_bp = Blueprint('course_bp', __name__)
 
-auth_service = AuthService()
-
 @course_bp.route("/courses", methods=["GET"])
 @auth_service.token_required
 def get_courses(current_user):
-    courses = CourseService.get_all_courses()
-    # Ensure that courses is an iterable or handle None
-    if courses is None:
-        return jsonify({'message': 'No courses found'}), 404
-    # Return the list of courses
-    return jsonify([{
-        'id': course.id,
-        'name': course.name,
-        'description': course.description
-    } for course in courses]), 200
+    if wants_stream():
+        courses = CourseService.iter_courses(current_app.config['API_STREAM_BATCH_SIZE'])
+        return stream_json_array(courses, course_serializer)
+
+    try:
+        page = parse_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if page is not None:
+        limit, after = page
+        courses = CourseService.get_courses_page(limit + 1, after)
+        return paginated_response(courses, limit, course_serializer)
+
+    # The full catalog is served from the response cache until a course is created or deleted
+    version = CourseService.get_catalog_version()
+    entry = response_cache.get(CATALOG_CACHE_KEY, version)
+    if entry is None:
+        courses = CourseService.get_all_courses()
+        # Ensure that courses is an iterable or handle None
+        if courses is None:
+            return jsonify({'message': 'No courses found'}), 404
+        body = course_serializer.encode(course_serializer.dump_many(courses)).encode()
+        entry = CachedBody(version, body)
+        # Inside an atomic POST /batch the body may include writes that could still roll back
+        after_commit(lambda: response_cache.set(CATALOG_CACHE_KEY, entry))
+
+    # Return the list of courses, or 304 if the client's ETag is still current
+    response = current_app.response_class(entry.body, mimetype='application/json')
+    response.cached_body = entry  # lets compression reuse the entry's gzipped copy
+    response.set_etag(entry.etag)
+    return response.make_conditional(request)
     
+@course_bp.route("/courses/search", methods=["GET"])
+@auth_service.token_required
+def search_courses(current_user):
+    q = request.args.get('q', '').strip()
+    limit = request.args.get('limit', current_app.config['SEARCH_DEFAULT_LIMIT'], type=int)
+    prefix = request.args.get('prefix', '').lower() in ('1', 'true', 'yes')
+
+    if not q or limit < 1:
+        return jsonify({'error': 'Invalid input'}), 400
+
+    limit = min(limit, current_app.config['API_MAX_PAGE_SIZE'])
+    courses = CourseService.search_courses(q, limit, prefix=prefix)
+    return list_response(courses, course_serializer)
+
 @course_bp.route("/courses", methods=["POST"])
 @auth_service.token_required
 def create_course(current_user):
@@ -27,9 +66,48 @@ def create_course(current_user):
     name = data.get('name')
     description = data.get('description')
 
+    capacity = data.get('capacity')
+
     if not name or not description:
         return jsonify({'error': 'Invalid input'}), 400
-    
-    new_course = CourseService.create_new_course(name, description)
+    if capacity is not None and (not isinstance(capacity, int) or isinstance(capacity, bool) or capacity < 0):
+        return jsonify({'error': 'capacity must be a non-negative integer'}), 400
+
+    new_course = CourseService.create_new_course(name, description, capacity=capacity)
+
+    return jsonify(course_serializer.dump(new_course)), 201
+
+
+@course_bp.route("/courses/<int:course_id>/seats", methods=["GET"])
+@auth_service.token_required
+def get_course_seats(current_user, course_id):
+    # Capacity, seats taken and waitlist length; cheap enough to poll during registration
+    seats = CourseService.get_seats(course_id)
+    if seats is None:
+        return jsonify({'error': 'Course not found'}), 404
+    course, waitlisted = seats
+    return jsonify({**course_seats_serializer.dump(course), 'waitlisted': waitlisted}), 200
+
+
+@course_bp.route("/courses/<int:course_id>", methods=["DELETE"])
+@auth_service.token_required
+def delete_course(current_user, course_id):
+    if not CourseService.delete_courses(ids=[course_id]):
+        return jsonify({'message': 'Course not found'}), 404
+    return jsonify({'message': 'Course deleted'}), 200
+
+@course_bp.route("/courses", methods=["DELETE"])
+@auth_service.token_required
+def delete_courses(current_user):
+    # Bulk delete by {"ids": [...]} in the body and/or ?name_prefix=
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    name_prefix = request.args.get('name_prefix')
+
+    if ids is None and not name_prefix:
+        return jsonify({'error': 'A filter (ids or name_prefix) is required'}), 400
+    if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        return jsonify({'error': 'Invalid input'}), 400
 
-    return jsonify({'id': new_course.id, 'name': new_course.name, 'description': new_course.description}), 201
\ No newline at end of file
+    deleted = CourseService.delete_courses(ids=ids, name_prefix=name_prefix or None)
+    return jsonify({'deleted': len(deleted), 'ids': deleted}), 200
@@ -1,13 +1,14 @@
-from flask import jsonify, Blueprint, request
+import json
+from collections import Counter
+from flask import jsonify, Blueprint, request, current_app
+from sqlalchemy.exc import IntegrityError
 from ..services.enrollment_service import EnrollmentService
-from src.services.auth_service import AuthService
+from ..serializers import enrollment_serializer, roster_serializer, schedule_serializer
+from ..pagination import list_response, paginated_response, parse_page_args
+from ..services.auth_service import auth_service
 
 enrollment_bp = Blueprint('enrollment', __name__)
 
-auth_service = AuthService()
-
-from unittest.mock import patch, MagicMock
-
 @enrollment_bp.route('/enroll', methods=['POST'])   
 @auth_service.token_required
 def enroll_user(current_user):
@@ -18,18 +19,113 @@ def enroll_user(current_user):
     if not user_id or not course_id:
         return jsonify({'error': 'Invalid input'}), 400
     
-    enrollment = EnrollmentService.enroll_user_in_course(user_id, course_id)
-    
-    return jsonify({'id': enrollment.id, 'user_id': enrollment.user_id, 'course_id': enrollment.course_id}), 201
+    try:
+        enrollment, created = EnrollmentService.enroll_user_in_course(user_id, course_id)
+    except IntegrityError:
+        # Foreign keys are enforced, so an unknown user or course fails the insert
+        return jsonify({'error': 'User or course not found'}), 404
+
+    if enrollment is None:
+        # The course is full; the user is enrolled automatically when a seat frees up
+        position = EnrollmentService.waitlist_position(user_id, course_id)
+        return jsonify({'waitlisted': True, 'user_id': user_id, 'course_id': course_id, 'position': position}), 202
+
+    # A retry gets the existing enrollment with 200, as in POST /enroll/batch
+    return jsonify(enrollment_serializer.dump(enrollment)), 201 if created else 200
+
+@enrollment_bp.route('/enroll/batch', methods=['POST'])
+@auth_service.token_required
+def enroll_users_batch(current_user):
+    # Accepts either a JSON array or an NDJSON stream of {user_id, course_id} objects
+    max_items = current_app.config['ENROLL_BATCH_MAX_ITEMS']
+    try:
+        items = _read_batch_items(max_items)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    results = [None] * len(items)
+    pairs, positions = [], []
+    for index, item in enumerate(items):
+        user_id = item.get('user_id') if isinstance(item, dict) else None
+        course_id = item.get('course_id') if isinstance(item, dict) else None
+        # bool is an int subclass; true/false are not ids
+        if not all(isinstance(i, int) and not isinstance(i, bool) for i in (user_id, course_id)):
+            results[index] = {'status': 400, 'error': 'Invalid input'}
+        else:
+            pairs.append((user_id, course_id))
+            positions.append(index)
+
+    if pairs:
+        for index, result in zip(positions, EnrollmentService.bulk_enroll(pairs)):
+            results[index] = result
+
+    results = [{'index': index, **result} for index, result in enumerate(results)]
+    statuses = Counter(result['status'] for result in results)
+    failed = sum(count for status, count in statuses.items() if status >= 400)
+    body = {
+        'created': statuses[201],
+        'existing': statuses[200],
+        'waitlisted': statuses[202],
+        'failed': failed,
+        'results': results,
+    }
+    # 207 Multi-Status tells the client to look at the per-item results
+    return jsonify(body), 207 if failed else 201
 
 @enrollment_bp.route('/enrollments/<int:user_id>', methods=['GET'])
 @auth_service.token_required
 def get_user_enrollments(current_user, user_id):
     enrollments = EnrollmentService.get_enrollments_for_user(user_id)
-    return jsonify([{'id': enrollment.id, 'user_id': enrollment.user_id, 'course_id': enrollment.course_id} for enrollment in enrollments])
+    return list_response(enrollments, enrollment_serializer)
+
+@enrollment_bp.route('/users/<int:user_id>/courses', methods=['GET'])
+@auth_service.token_required
+def get_user_schedule(current_user, user_id):
+    # The user's courses with full course records, paginated by enrollment id
+    try:
+        limit, after = parse_page_args() or (current_app.config['API_DEFAULT_PAGE_SIZE'], None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    rows = EnrollmentService.get_user_schedule(user_id, limit + 1, after)
+    return paginated_response(rows, limit, schedule_serializer, cursor_key='enrollment_id')
+
+@enrollment_bp.route('/courses/<int:course_id>/students', methods=['GET'])
+@auth_service.token_required
+def get_course_roster(current_user, course_id):
+    # The course's students with full user records, paginated by enrollment id
+    try:
+        limit, after = parse_page_args() or (current_app.config['API_DEFAULT_PAGE_SIZE'], None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    rows = EnrollmentService.get_course_roster(course_id, limit + 1, after)
+    return paginated_response(rows, limit, roster_serializer, cursor_key='enrollment_id')
 
 @enrollment_bp.route('/enrollments/<int:enrollment_id>', methods=['DELETE'])
 @auth_service.token_required
 def remove_enrollment(current_user, enrollment_id):
-    EnrollmentService.remove_enrollment(enrollment_id)
-    return jsonify({'message': 'Enrollment removed'}), 200
\ No newline at end of file
+    if not EnrollmentService.remove_enrollment(enrollment_id):
+        return jsonify({'message': 'Enrollment not found'}), 404
+    return jsonify({'message': 'Enrollment removed'}), 200
+
+def _read_batch_items(max_items):
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = []
+        for line in request.stream:
+            if not line.strip():
+                continue
+            if len(items) == max_items:
+                raise ValueError(f'At most {max_items} items per batch')
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f'Invalid JSON on line {len(items) + 1}')
+        return items
+
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        raise ValueError('Expected a JSON array of enrollments')
+    if len(items) > max_items:
+        raise ValueError(f'At most {max_items} items per batch')
+    return items
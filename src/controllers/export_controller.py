@@ -0,0 +1,29 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from ..services.enrollment_service import EnrollmentService, EXPORT_FIELDS
+from ..services.auth_service import auth_service
+from ..serializers import Serializer
+from ..pagination import stream_csv, stream_ndjson
+
+export_bp = Blueprint('export_bp', __name__)
+
+@export_bp.route('/export/enrollments', methods=['GET'])
+@auth_service.token_required
+def export_enrollments(current_user):
+    # Full enrollment dump with usernames, emails and course names, streamed in constant memory.
+    # ?format=csv (default) or ndjson; ?since=<ISO date or datetime> keeps enrollments made from then on
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+
+    since = request.args.get('since')
+    try:
+        since = datetime.fromisoformat(since) if since else None
+    except ValueError:
+        return jsonify({'error': 'since must be an ISO 8601 date or datetime'}), 400
+
+    batch_size = current_app.config['API_STREAM_BATCH_SIZE']
+    rows = EnrollmentService.iter_enrollment_export(since, batch_size)
+    if fmt == 'csv':
+        return stream_csv(rows, EXPORT_FIELDS, batch_size, filename='enrollments.csv')
+    return stream_ndjson(rows, EXPORT_FIELDS, Serializer.encode, batch_size, filename='enrollments.ndjson')
@@ -0,0 +1,9 @@
+from flask import Blueprint, Response
+from ..metrics import metrics
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Prometheus text exposition format, scraped without a JWT
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
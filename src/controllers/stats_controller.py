@@ -0,0 +1,27 @@
+from datetime import date
+from flask import Blueprint, request, jsonify
+from ..services.stats_service import StatsService
+from ..services.auth_service import auth_service
+from ..serializers import course_stats_serializer, daily_stats_serializer
+from ..pagination import list_response
+
+stats_bp = Blueprint('stats_bp', __name__)
+
+@stats_bp.route('/stats/courses', methods=['GET'])
+@auth_service.token_required
+def get_course_stats(current_user):
+    # Enrollment counts per course, read from the summary table
+    counts = StatsService.get_course_counts()
+    return list_response(counts, course_stats_serializer)
+
+@stats_bp.route('/stats/enrollments/daily', methods=['GET'])
+@auth_service.token_required
+def get_daily_stats(current_user):
+    # Enrollments per day, optionally limited to ?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive)
+    try:
+        start, end = (date.fromisoformat(request.args[name]) if name in request.args else None for name in ('from', 'to'))
+    except ValueError:
+        return jsonify({'error': 'from and to must be dates (YYYY-MM-DD)'}), 400
+
+    counts = StatsService.get_daily_counts(start, end)
+    return list_response(counts, daily_stats_serializer)
@@ -1,19 +1,34 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from ..services.user_service import UserService
-from ..services.auth_service import AuthService
+from ..services.auth_service import auth_service
+from ..serializers import user_serializer
+from ..pagination import list_response, parse_page_args, paginated_response, stream_json_array, wants_stream
 
 user_bp = Blueprint('user_bp', __name__)
-auth_service = AuthService()
 
 @user_bp.route("/users", methods=["GET"])
 @auth_service.token_required
 def get_users(current_user):
     # Once the user is authenticated, their information is passed into the decorated function
     # as the current_user argument.
+    if wants_stream():
+        users = UserService.iter_users(current_app.config['API_STREAM_BATCH_SIZE'])
+        return stream_json_array(users, user_serializer)
+
+    try:
+        page = parse_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if page is not None:
+        limit, after = page
+        users = UserService.get_users_page(limit + 1, after)
+        return paginated_response(users, limit, user_serializer)
+
     users = UserService.get_all_users()
     if users is None:
         return jsonify({'message': 'No users found'}), 404
-    return jsonify([{'id': user.id, 'username': user.username, 'email': user.email} for user in users]), 200 
+    return list_response(users, user_serializer)
 
 @user_bp.route("/users", methods=["POST"])
 @auth_service.token_required
@@ -28,4 +43,27 @@ def create_user(current_user):
     
     new_user = UserService.create_new_user(username, email)
 
-    return jsonify({'id': new_user.id, 'username': new_user.username, 'email': new_user.email}), 201
\ No newline at end of file
+    return jsonify(user_serializer.dump(new_user)), 201
+
+@user_bp.route("/users/<int:user_id>", methods=["DELETE"])
+@auth_service.token_required
+def delete_user(current_user, user_id):
+    if not UserService.delete_users(ids=[user_id]):
+        return jsonify({'message': 'User not found'}), 404
+    return jsonify({'message': 'User deleted'}), 200
+
+@user_bp.route("/users", methods=["DELETE"])
+@auth_service.token_required
+def delete_users(current_user):
+    # Bulk delete by {"ids": [...]} in the body and/or ?email_domain=
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    email_domain = request.args.get('email_domain')
+
+    if ids is None and not email_domain:
+        return jsonify({'error': 'A filter (ids or email_domain) is required'}), 400
+    if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        return jsonify({'error': 'Invalid input'}), 400
+
+    deleted = UserService.delete_users(ids=ids, email_domain=email_domain or None)
+    return jsonify({'deleted': len(deleted), 'ids': deleted}), 200
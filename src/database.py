@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from .extensions import db
+
+
+def engine_options(config):
+    """
+    Build SQLAlchemy engine keyword arguments from the DB_* settings.
+    """
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    if config['DB_POOL_RECYCLE'] is not None:
+        options['pool_recycle'] = config['DB_POOL_RECYCLE']
+
+    # SQLite in-memory databases use a StaticPool, which takes no sizing arguments
+    if not config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        if config['DB_POOL_SIZE'] is not None:
+            options['pool_size'] = config['DB_POOL_SIZE']
+        if config['DB_MAX_OVERFLOW'] is not None:
+            options['max_overflow'] = config['DB_MAX_OVERFLOW']
+
+    return options
+
+
+def install_sqlite_pragmas(engine, config):
+    """
+    Apply the SQLITE_* PRAGMAs to each new connection of a SQLite engine.
+    WAL lets readers run while a writer commits, and the busy timeout makes
+    writers wait for the lock instead of failing immediately.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}",
+        f"PRAGMA foreign_keys={'ON' if config['SQLITE_FOREIGN_KEYS'] else 'OFF'}",
+    ]
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def insert_ignoring_duplicates(target, index_elements=None):
+    """
+    INSERT ... ON CONFLICT DO NOTHING for the current dialect. `target` may be a
+    model or a Table; rows that violate a unique constraint are skipped.
+    """
+    dialect_insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    return dialect_insert(target).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def insert_or_increment(target, index_elements, column):
+    """
+    INSERT ... ON CONFLICT DO UPDATE that adds the inserted value of `column` to the
+    existing row's instead of failing, e.g. for maintaining counters.
+    """
+    dialect_insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    stmt = dialect_insert(target)
+    table = stmt.table
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: table.c[column] + stmt.excluded[column]},
+    )
+
+
+def after_commit(callback):
+    """
+    Run `callback` (e.g. a cache invalidation) once the session's writes are committed:
+    right away if it has none pending, else when the transaction commits. It is dropped
+    if the transaction rolls back, so caches never see data that was not committed.
+    """
+    session = db.session()
+    if session.info.get('uncommitted'):
+        session.info.setdefault('after_commit', []).append(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def deferred_commits():
+    """
+    Turn `db.session.commit()` into a flush until the block exits, so service calls
+    made inside it share one transaction. The caller commits or rolls back; callbacks
+    registered with `after_commit` wait for that real commit.
+    """
+    session = db.session()
+    session.info['defer_commit'] = True
+    try:
+        yield session
+    finally:
+        session.info.pop('defer_commit', None)
@@ -1,6 +1,15 @@
 # extensions.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from .cache import LRUCache, ResponseCache
+from .routing import RoutingSession
 
-db = SQLAlchemy()
-migrate = Migrate()
\ No newline at end of file
+# RoutingSession sends reads to the optional `replica` bind (see routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
+
+# Authenticated users keyed on JWT identity, so protected routes skip the user lookup
+principal_cache = LRUCache('AUTH_PRINCIPAL_CACHE', maxsize=10000, ttl=300)
+
+# Serialized bodies of hot, rarely changing responses such as the course catalog
+response_cache = ResponseCache()
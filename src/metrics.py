@@ -0,0 +1,263 @@
+import itertools
+import threading
+import time
+import weakref
+
+from flask import current_app, g, request
+from sqlalchemy import event
+
+from .extensions import db, principal_cache, response_cache
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# WSGI environ key of the measurements of the current (outer) request; nested request
+# contexts (POST /batch sub-requests) share `g` but not the environ
+METRICS_KEY = 'app.request_metrics'
+
+
+class _EndpointStats:
+    __slots__ = ('requests', 'statuses', 'latency_sum', 'buckets', 'db_seconds', 'queries', 'n_plus_one')
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.latency_sum = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.n_plus_one = 0
+
+    def add(self, other):
+        self.requests += other.requests
+        for status, count in list(other.statuses.items()):
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.latency_sum += other.latency_sum
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.db_seconds += other.db_seconds
+        self.queries += other.queries
+        self.n_plus_one += other.n_plus_one
+
+
+class _ShardOwner:
+    # Lives in a thread's local storage; its finalizer runs when the thread exits
+    __slots__ = ('__weakref__',)
+
+
+class Metrics:
+    """
+    Per-endpoint request latency, DB time and SQL statement counts.
+
+    Every worker thread writes to its own shard, so recording a request never takes
+    a lock; the shards are only summed when /metrics is scraped. When a thread exits
+    (e.g. with a thread-per-request server) its shard is folded into `_retired`, so
+    the number of shards stays bounded by the number of live threads.
+
+    A request is recorded at teardown, so a streamed body's statements and time count.
+    """
+
+    def __init__(self):
+        self.n_plus_one_threshold = 10
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+        self._shard_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._collectors = []
+
+    def init_app(self, app):
+        self.n_plus_one_threshold = app.config.setdefault('METRICS_N_PLUS_ONE_THRESHOLD', 10)
+        with self._lock:
+            self._shards = {}
+            self._retired = {}
+        self._local = threading.local()
+        self._collectors = [_cache_samples]
+        if not app.config.setdefault('METRICS_ENABLED', True):
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def add_collector(self, collector):
+        """
+        Register a callable returning extra (name, type, help, [(labels, value)]) metric families.
+        """
+        self._collectors.append(collector)
+
+    def _shard(self):
+        shard = getattr(self._local, 'stats', None)
+        if shard is None:
+            shard = self._local.stats = {}
+            shard_id = next(self._shard_ids)
+            self._local.owner = owner = _ShardOwner()
+            with self._lock:
+                self._shards[shard_id] = shard
+            weakref.finalize(owner, self._retire, shard_id)
+        return shard
+
+    def _retire(self, shard_id):
+        with self._lock:
+            shard = self._shards.pop(shard_id, None)
+            if shard is not None:
+                _merge(self._retired, shard)
+
+    def _before_request(self):
+        # [start, statements, seconds spent in the database, status]
+        request.environ[METRICS_KEY] = g._request_metrics = [time.perf_counter(), 0, 0.0, None]
+
+    def _after_request(self, response):
+        current = request.environ.get(METRICS_KEY)
+        if current is not None:
+            current[3] = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        # After the response, including a streamed body, is done
+        current = request.environ.pop(METRICS_KEY, None)
+        if current is None:
+            return
+        g.pop('_request_metrics', None)
+        self._record(request.endpoint or 'unmatched', current[3] or 500, current)
+
+    def measure_nested(self, handle):
+        """
+        Call `handle()`, which returns the response of a request run inside the current one
+        (a POST /batch sub-request), and record it under its own endpoint instead of adding
+        its SQL statements to the enclosing request's.
+        """
+        outer = g.pop('_request_metrics', None)
+        if outer is None:
+            return handle()
+
+        current = g._request_metrics = [time.perf_counter(), 0, 0.0, None]
+        try:
+            response = handle()
+        finally:
+            g._request_metrics = outer
+        self._record(request.endpoint or 'unmatched', response.status_code, current)
+        return response
+
+    def _record(self, endpoint, status_code, current):
+        started, queries, db_seconds, _ = current
+        elapsed = time.perf_counter() - started
+
+        shard = self._shard()
+        stats = shard.get(endpoint)
+        if stats is None:
+            stats = shard[endpoint] = _EndpointStats()
+        stats.requests += 1
+        stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+        stats.latency_sum += elapsed
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                stats.buckets[i] += 1
+                break
+        stats.db_seconds += db_seconds
+        stats.queries += queries
+
+        if queries > self.n_plus_one_threshold:
+            stats.n_plus_one += 1
+            current_app.logger.warning('Possible N+1: %s ran %d SQL statements', endpoint, queries)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # On the execution context rather than the connection: after_cursor_execute does
+        # not run for a failed statement, which would leave its start time behind
+        context._metrics_query_start = time.perf_counter()
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = context._metrics_query_start
+        current = g.get('_request_metrics') if g else None
+        if current is not None:
+            current[1] += 1
+            current[2] += time.perf_counter() - started
+
+    def snapshot(self):
+        """
+        Sum the per-thread shards into one {endpoint: _EndpointStats} dict.
+        """
+        totals = {}
+        with self._lock:
+            _merge(totals, self._retired)
+            shards = list(self._shards.values())
+        for shard in shards:
+            _merge(totals, shard)
+        return totals
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        totals = sorted(self.snapshot().items())
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+
+        family('http_requests_total', 'counter', 'Requests handled, by endpoint and status.', [
+            ({'endpoint': endpoint, 'status': status}, count)
+            for endpoint, stats in totals for status, count in sorted(stats.statuses.items())
+        ])
+
+        lines.append('# HELP http_request_duration_seconds Request latency.')
+        lines.append('# TYPE http_request_duration_seconds histogram')
+        for endpoint, stats in totals:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {stats.requests}')
+            lines.append(f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats.latency_sum:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats.requests}')
+
+        family('db_queries_total', 'counter', 'SQL statements executed while handling requests.', [
+            ({'endpoint': endpoint}, stats.queries) for endpoint, stats in totals
+        ])
+        family('db_duration_seconds_total', 'counter', 'Time spent executing SQL while handling requests.', [
+            ({'endpoint': endpoint}, f'{stats.db_seconds:.6f}') for endpoint, stats in totals
+        ])
+        family('db_n_plus_one_requests_total', 'counter',
+               f'Requests that ran more than {self.n_plus_one_threshold} SQL statements.', [
+                   ({'endpoint': endpoint}, stats.n_plus_one) for endpoint, stats in totals
+               ])
+
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                family(name, kind, help_text, samples)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _merge(totals, shard):
+    # Add a shard's {endpoint: _EndpointStats} into `totals`
+    for endpoint, stats in list(shard.items()):
+        total = totals.get(endpoint)
+        if total is None:
+            total = totals[endpoint] = _EndpointStats()
+        total.add(stats)
+
+
+def _cache_samples():
+    return [
+        ('cache_hits_total', 'counter', 'In-process cache hits.', [
+            ({'cache': 'principal'}, principal_cache.hits),
+            ({'cache': 'response'}, response_cache.hits),
+        ]),
+        ('cache_misses_total', 'counter', 'In-process cache misses.', [
+            ({'cache': 'principal'}, principal_cache.misses),
+            ({'cache': 'response'}, response_cache.misses),
+        ]),
+    ]
+
+
+metrics = Metrics()
@@ -1,3 +1,8 @@
 from ..extensions import db
 from .user import User
 from .course import Course
+from .revoked_token import RevokedToken
+from .waitlist import WaitlistEntry
+from .change_log import ChangeLog
+from .cache_version import CacheVersion
+from .enrollment_stats import CourseEnrollmentCount, DailyEnrollmentCount
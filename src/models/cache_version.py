@@ -0,0 +1,13 @@
+from ..extensions import db
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String
+
+class CacheVersion(db.Model):
+    """
+    Version of a response_cache key, bumped in the transaction that changes the cached
+    data. Every process compares its cached entry with this row, so a write made by
+    another worker (or `flask import`) is picked up on the next request.
+    """
+    __tablename__ = 'cache_version'
+    key: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(nullable=False, default=0)
@@ -0,0 +1,62 @@
+from ..extensions import db
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DDL, event, func
+
+# Tables whose changes are published at GET /changes (the table name is the entity name),
+# with the columns whose updates count as changes (e.g. not a course's seat counter)
+TRACKED_TABLES = {
+    'user': ('username', 'email'),
+    'course': ('name', 'description'),
+    'enrollment': ('user_id', 'course_id'),
+}
+
+class ChangeLog(db.Model):
+    """
+    The latest change of every tracked row. Its id increases with every change, so it
+    is both the row's version and the cursor of the change feed. Deleted rows keep an
+    entry with op 'delete' (a tombstone).
+    """
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        db.Index('uq_change_log_entity', 'entity', 'entity_id', unique=True),
+        # Ids must never be reused, or a client could miss a change made under an id it has seen
+        {'sqlite_autoincrement': True},
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entity: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[int] = mapped_column(nullable=False)
+    op: Mapped[str] = mapped_column(String(6), nullable=False)  # 'upsert' or 'delete'
+    changed_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=False, server_default=func.current_timestamp())
+
+
+def _record(entity, row, op):
+    # Replacing the row's previous entry keeps one entry per row, so a poll returns each
+    # changed row once however often it changed, and the log grows with rows, not writes
+    return (
+        f"DELETE FROM change_log WHERE entity = '{entity}' AND entity_id = {row}.id; "
+        f"INSERT INTO change_log(entity, entity_id, op) VALUES ('{entity}', {row}.id, '{op}');"
+    )
+
+# SQLite triggers fill the log, so writes made with Core statements, imports and
+# ON DELETE CASCADE are all captured.
+CHANGE_LOG_DDL = []
+CHANGE_LOG_DROP_DDL = []
+for table, columns in TRACKED_TABLES.items():
+    CHANGE_LOG_DDL += [
+        f'CREATE TRIGGER IF NOT EXISTS {table}_changes_insert AFTER INSERT ON "{table}" '
+        f"BEGIN {_record(table, 'new', 'upsert')} END",
+        f'CREATE TRIGGER IF NOT EXISTS {table}_changes_update AFTER UPDATE OF {", ".join(columns)} ON "{table}" '
+        f"BEGIN {_record(table, 'new', 'upsert')} END",
+        f'CREATE TRIGGER IF NOT EXISTS {table}_changes_delete AFTER DELETE ON "{table}" '
+        f"BEGIN {_record(table, 'old', 'delete')} END",
+    ]
+    CHANGE_LOG_DROP_DDL += [f'DROP TRIGGER IF EXISTS {table}_changes_{op}' for op in ('insert', 'update', 'delete')]
+
+# On the whole metadata: the triggers need both the tracked tables and change_log, and must
+# go before drop_all, whose implicit deletes can cascade into them
+for statement in CHANGE_LOG_DDL:
+    event.listen(db.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in CHANGE_LOG_DROP_DDL:
+    event.listen(db.metadata, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
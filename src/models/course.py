@@ -1,11 +1,58 @@
+from typing import Optional
 from ..extensions import db
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, DDL, Table, Column, Integer, MetaData, event
 
 class Course(db.Model):
     __tablename__ = 'course'
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=False)
+
+    # Seat limit (None: unlimited) and seats held by enrollments; EnrollmentService
+    # changes seats_taken only with conditional UPDATEs so concurrent enrollments cannot overbook
+    capacity: Mapped[Optional[int]] = mapped_column(nullable=True)
+    seats_taken: Mapped[int] = mapped_column(nullable=False, default=0, server_default='0')
     
-    enrollments: Mapped[list["Enrollment"]] = relationship("Enrollment", back_populates="course", cascade="all, delete-orphan")
\ No newline at end of file
+    enrollments: Mapped[list["Enrollment"]] = relationship("Enrollment", back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
+
+
+# SQLite FTS5 index over course name and description. It is an external-content
+# table (it stores only the index, not a copy of the rows) kept in sync by triggers,
+# and it indexes 2 and 3 character prefixes so autocomplete queries stay fast.
+SEARCH_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS course_fts USING fts5("
+    "name, description, content='course', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_insert AFTER INSERT ON course BEGIN "
+    "INSERT INTO course_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_delete AFTER DELETE ON course BEGIN "
+    "INSERT INTO course_fts(course_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    # Only name and description changes touch the index, not seat counter updates
+    "DROP TRIGGER IF EXISTS course_fts_update",
+    "CREATE TRIGGER IF NOT EXISTS course_fts_update AFTER UPDATE OF name, description ON course BEGIN "
+    "INSERT INTO course_fts(course_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO course_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+]
+
+SEARCH_INDEX_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS course_fts_insert",
+    "DROP TRIGGER IF EXISTS course_fts_delete",
+    "DROP TRIGGER IF EXISTS course_fts_update",
+    "DROP TABLE IF EXISTS course_fts",
+]
+
+for statement in SEARCH_INDEX_DDL:
+    event.listen(Course.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in SEARCH_INDEX_DROP_DDL:
+    event.listen(Course.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+# Query-only handle on the virtual table; its own MetaData keeps it out of create_all
+course_fts = Table(
+    'course_fts', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('course_fts'),  # the hidden column named after the table, used with MATCH
+    Column('name', String),
+    Column('description', String),
+)
@@ -4,12 +4,19 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 class Enrollment(db.Model):
     __tablename__ = 'enrollment'
+    __table_args__ = (
+        # Leading user_id column also serves lookups of a user's enrollments
+        db.Index('uq_enrollment_user_course', 'user_id', 'course_id', unique=True),
+        db.Index('ix_enrollment_course_id', 'course_id'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
    
-    user_id: Mapped[int] = mapped_column(db.ForeignKey('user.id'))
-    course_id: Mapped[int] = mapped_column(db.ForeignKey('course.id'))
+    # The database removes enrollments when their user or course is deleted
+    user_id: Mapped[int] = mapped_column(db.ForeignKey('user.id', ondelete='CASCADE'))
+    course_id: Mapped[int] = mapped_column(db.ForeignKey('course.id', ondelete='CASCADE'))
 
     enrollment_date: Mapped[datetime] = mapped_column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     user: Mapped["User"] = relationship('User', back_populates='enrollments')
-    course: Mapped["Course"] = relationship('Course', back_populates='enrollments')
\ No newline at end of file
+    course: Mapped["Course"] = relationship('Course', back_populates='enrollments')
@@ -0,0 +1,19 @@
+from ..extensions import db
+from datetime import date
+from sqlalchemy.orm import Mapped, mapped_column
+
+# Summary tables kept in step with the enrollment table by EnrollmentService
+# (see services/stats_service.py); rebuild them with `flask rebuild-enrollment-stats`.
+
+class CourseEnrollmentCount(db.Model):
+    __tablename__ = 'course_enrollment_count'
+    # Removed together with the course
+    course_id: Mapped[int] = mapped_column(db.ForeignKey('course.id', ondelete='CASCADE'), primary_key=True)
+    enrollments: Mapped[int] = mapped_column(nullable=False, default=0)
+
+
+class DailyEnrollmentCount(db.Model):
+    __tablename__ = 'daily_enrollment_count'
+    # Current enrollments by the UTC day they were made on
+    day: Mapped[date] = mapped_column(db.Date, primary_key=True)
+    enrollments: Mapped[int] = mapped_column(nullable=False, default=0)
@@ -0,0 +1,11 @@
+from ..extensions import db
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_token'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    jti: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
+    # Rows past their expiry can be purged: the token would be rejected anyway
+    expires_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=False, index=True)
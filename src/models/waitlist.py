@@ -0,0 +1,16 @@
+from ..extensions import db
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+
+class WaitlistEntry(db.Model):
+    __tablename__ = 'waitlist_entry'
+    __table_args__ = (
+        db.Index('uq_waitlist_user_course', 'user_id', 'course_id', unique=True),
+        # Ids increase with arrival, so this index serves a course's queue in FIFO order
+        db.Index('ix_waitlist_course_id_id', 'course_id', 'id'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(db.ForeignKey('user.id', ondelete='CASCADE'))
+    course_id: Mapped[int] = mapped_column(db.ForeignKey('course.id', ondelete='CASCADE'))
+    created_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,128 @@
+import csv
+import io
+from datetime import date, datetime
+from itertools import islice
+
+from flask import Response, current_app, request, stream_with_context, url_for
+
+
+def parse_page_args():
+    """
+    Read the keyset pagination parameters (`limit` and `after`) from the query string.
+    Returns None when the client did not ask for a page, otherwise (limit, after).
+    """
+    if 'limit' not in request.args and 'after' not in request.args:
+        return None
+
+    try:
+        limit = int(request.args.get('limit', current_app.config['API_DEFAULT_PAGE_SIZE']))
+        after = request.args.get('after')
+        after = int(after) if after is not None else None
+    except ValueError:
+        raise ValueError('limit and after must be integers')
+
+    if limit < 1:
+        raise ValueError('limit must be positive')
+
+    return min(limit, current_app.config['API_MAX_PAGE_SIZE']), after
+
+
+def wants_stream():
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def list_response(rows, serializer, status=200):
+    body = serializer.encode(serializer.dump_many(rows))
+    return Response(body, status=status, mimetype='application/json')
+
+
+def paginated_response(rows, limit, serializer, cursor_key='id'):
+    """
+    Build a page from `rows`, which must hold up to limit + 1 items ordered by `cursor_key`.
+    The extra row only tells us whether there is a next page; the cursor is sent
+    back as a `Link: <...>; rel="next"` header so the body stays a plain list.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    response = list_response(rows, serializer)
+
+    if has_more:
+        cursor = getattr(rows[-1], cursor_key)
+        next_url = url_for(request.endpoint, limit=limit, after=cursor, **request.view_args)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+        response.headers['X-Next-Cursor'] = str(cursor)
+
+    return response
+
+
+def stream_json_array(rows, serializer, chunk_size=500):
+    """
+    Stream `rows` as a JSON array, `chunk_size` elements per chunk, so the full body
+    is never held in memory. `rows` should be a lazily fetched result (e.g. using yield_per).
+    """
+    rows = iter(rows)
+
+    def generate():
+        yield '['
+        separator = ''
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            # Encode the chunk as an array and drop its brackets
+            yield separator + serializer.encode(serializer.dump_many(chunk))[1:-1]
+            separator = ','
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def _chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+
+def stream_csv(rows, fields, chunk_size=500, filename=None):
+    """
+    Stream `rows` (tuples in `fields` order) as CSV with a header row, `chunk_size`
+    rows per chunk, so the full body is never held in memory.
+    """
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for chunk in _chunks(rows, chunk_size):
+            writer.writerows([[_csv_value(value) for value in row] for row in chunk])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    return _attachment(Response(stream_with_context(generate()), mimetype='text/csv'), filename)
+
+
+def stream_ndjson(rows, fields, encode, chunk_size=500, filename=None):
+    """
+    Stream `rows` as newline-delimited JSON objects keyed by `fields`, using `encode`
+    (e.g. `Serializer.encode`) for each object.
+    """
+    def generate():
+        for chunk in _chunks(rows, chunk_size):
+            yield ''.join(encode(dict(zip(fields, row))) + '\n' for row in chunk)
+
+    return _attachment(Response(stream_with_context(generate()), mimetype='application/x-ndjson'), filename)
+
+
+def _attachment(response, filename):
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
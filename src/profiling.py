@@ -0,0 +1,140 @@
+import cProfile
+import hmac
+import os
+import random
+import re
+import threading
+import time
+import uuid
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+from .extensions import db
+
+# WSGI environ key of the profile of the current (outer) request; nested request
+# contexts (POST /batch sub-requests) share `g` but not the environ
+PROFILE_KEY = 'app.request_profile'
+
+
+class _RequestProfile:
+    __slots__ = ('id', 'profiler', 'started', 'statements')
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.profiler = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.statements = []  # [statement, parameters, seconds, or None if it failed]
+
+
+class RequestProfiler:
+    """
+    cProfile for selected requests, written as `.pstats` files to PROFILING_DIR.
+
+    A request is profiled when it carries PROFILING_HEADER set to PROFILING_TOKEN, or
+    at random with probability PROFILING_SAMPLE_RATE. Each dump is named after the
+    time, endpoint and duration; with PROFILING_SQL the statements the request ran are
+    written next to it in a `.sql` file. When PROFILING_ENABLED is off nothing is
+    registered, so requests pay nothing.
+
+    cProfile's hook is global to the interpreter, so only one request per process is
+    profiled at a time; a request selected while another is being profiled runs
+    without the profiler.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self.sample_rate = 0.0
+        self.header = 'X-Profile'
+        self.token = None
+        self.min_duration = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault('PROFILING_ENABLED', False)
+        if not self.enabled:
+            return
+
+        self.directory = app.config.setdefault('PROFILING_DIR', None) or os.path.join(app.instance_path, 'profiles')
+        self.sample_rate = app.config.setdefault('PROFILING_SAMPLE_RATE', 0.0)
+        self.header = app.config.setdefault('PROFILING_HEADER', 'X-Profile')
+        self.token = app.config.setdefault('PROFILING_TOKEN', None)
+        self.min_duration = app.config.setdefault('PROFILING_MIN_DURATION_MS', 0) / 1000
+        os.makedirs(self.directory, exist_ok=True)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        if app.config.setdefault('PROFILING_SQL', True):
+            with app.app_context():
+                for engine in db.engines.values():
+                    event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                    event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _wanted(self):
+        value = request.headers.get(self.header)
+        if value is not None and self.token:
+            return hmac.compare_digest(value.encode(), self.token.encode())
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _before_request(self):
+        if not self._wanted() or not self._lock.acquire(blocking=False):
+            return
+        profile = _RequestProfile()
+        try:
+            profile.profiler.enable()
+        except ValueError:
+            # Another profiling tool (e.g. a debugger or coverage) owns the hook
+            self._lock.release()
+            return
+        request.environ[PROFILE_KEY] = g._request_profile = profile
+
+    def _after_request(self, response):
+        profile = request.environ.get(PROFILE_KEY)
+        if profile is not None:
+            response.headers['X-Profile-Id'] = profile.id
+        return response
+
+    def _teardown_request(self, exc):
+        # After the response (including a streamed body) is done
+        profile = request.environ.pop(PROFILE_KEY, None)
+        if profile is None:
+            return
+        profile.profiler.disable()
+        self._lock.release()
+        g.pop('_request_profile', None)
+
+        elapsed = time.perf_counter() - profile.started
+        if elapsed < self.min_duration:
+            return
+        endpoint = re.sub(r'[^\w.-]', '_', request.endpoint or 'unmatched')
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint}-{elapsed * 1000:.0f}ms-{profile.id}"
+        path = os.path.join(self.directory, name)
+        try:
+            profile.profiler.dump_stats(path + '.pstats')
+            if profile.statements:
+                with open(path + '.sql', 'w', encoding='utf-8') as f:
+                    f.write(f'-- {request.method} {request.full_path} ({elapsed * 1000:.1f} ms)\n')
+                    for statement, parameters, seconds in profile.statements:
+                        timing = 'failed' if seconds is None else f'{seconds * 1000:.2f} ms'
+                        f.write(f'\n-- {timing}; parameters: {parameters!r}\n{statement};\n')
+        except OSError:
+            current_app.logger.exception('Could not write request profile %s', path)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        profile = g.get('_request_profile') if has_app_context() else None
+        if profile is not None:
+            entry = [statement, parameters, None]
+            profile.statements.append(entry)
+            # On the execution context, since after_cursor_execute is skipped when the statement fails
+            context._profiled_statement = (entry, time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        pending = getattr(context, '_profiled_statement', None)
+        if pending is not None:
+            entry, started = pending
+            entry[2] = time.perf_counter() - started
+
+
+profiler = RequestProfiler()
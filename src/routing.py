@@ -0,0 +1,142 @@
+import functools
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+
+# Key of the read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+_read_only = ContextVar('read_only', default=False)
+_primary = ContextVar('primary', default=False)
+
+
+def read_only(f):
+    """
+    Mark a service method as read-only so its queries may be served by the replica,
+    whatever the HTTP method of the current request.
+    """
+    @functools.wraps(f)
+    def decorated(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return f(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+
+    return decorated
+
+
+def primary(f):
+    """
+    Mark a service method whose queries must use the primary even in a GET request,
+    e.g. reads that fill a cache, which would keep a lagging replica's data after it
+    caught up.
+    """
+    @functools.wraps(f)
+    def decorated(*args, **kwargs):
+        token = _primary.set(True)
+        try:
+            return f(*args, **kwargs)
+        finally:
+            _primary.reset(token)
+
+    return decorated
+
+
+class ReplicaHealth:
+    """
+    Remembers replicas that failed a query, so they are skipped for a while
+    instead of every request paying for the failure first.
+    """
+
+    def __init__(self):
+        self.retry_after = 30
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.retry_after = app.config.setdefault('REPLICA_RETRY_SECONDS', self.retry_after)
+        with self._lock:
+            self._down_until.clear()
+
+    def is_available(self, engine):
+        return self._down_until.get(engine, 0) <= time.monotonic()
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + self.retry_after
+
+
+replica_health = ReplicaHealth()
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the `replica` bind when one is configured.
+
+    SELECTs issued by GET/HEAD requests or inside `read_only` service methods use
+    the replica, unless they run inside a `primary` service method. Everything else uses the primary, and once a session has written
+    anything, its later reads use the primary too so a request reads its own writes.
+    If the replica fails a query, the query is retried on the primary.
+
+    Inside `deferred_commits()` (an atomic POST /batch), `commit()` only flushes so
+    that several units of work share one transaction; the caller commits once.
+    """
+
+    def commit(self):
+        if self.info.get('defer_commit'):
+            self.flush()
+            return
+        super().commit()
+
+    def replica_engine(self):
+        engine = self._db.engines.get(REPLICA_BIND)
+        if engine is None or self.info.get('wrote') or _primary.get() or not replica_health.is_available(engine):
+            return None
+        if _read_only.get() or (has_request_context() and request.method in ('GET', 'HEAD')):
+            return engine
+        return None
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _route_statement(state):
+    if not state.is_select:
+        state.session.info['wrote'] = state.session.info['uncommitted'] = True
+        return None
+    if 'bind' in state.bind_arguments:
+        return None
+
+    replica = state.session.replica_engine()
+    if replica is None:
+        return None
+
+    try:
+        return state.invoke_statement(bind_arguments={'bind': replica})
+    except DBAPIError:
+        replica_health.mark_down(replica)
+        return state.invoke_statement()
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info['wrote'] = session.info['uncommitted'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _run_after_commit(session):
+    for callback in session.info.pop('after_commit', ()):
+        callback()
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _end_transaction(session, transaction):
+    # Whether committed or rolled back, nothing is pending any more; callbacks that are
+    # still queued belonged to a rolled back transaction
+    if transaction.parent is None:
+        session.info.pop('uncommitted', None)
+        session.info.pop('after_commit', None)
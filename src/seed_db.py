@@ -1,11 +1,15 @@
-from models.user import User
-from extensions import db
+from . import create_app
+from .models.user import User
+from .extensions import db
 
 # see the db table user with the following values: 
 # {
 #     "username": "john_doe",
 #     "email": "john@example.com"
 # }
+#
+# run from the root with: python -m src.seed_db
+# (use `flask --app src import` to load larger data sets)
 
 def seed_db():
     try:
@@ -13,10 +17,11 @@ def seed_db():
         db.session.add(new_user)
         db.session.commit()
     except Exception as e:
-        db.rollback()
+        db.session.rollback()
         print(f"Error: {e}")
     finally:
-        db.close()
+        db.session.close()
 
 if __name__ == "__main__":
-    seed_db()
\ No newline at end of file
+    with create_app().app_context():
+        seed_db()
@@ -0,0 +1,90 @@
+import json
+from datetime import date, datetime
+from operator import attrgetter
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+
+from .models.user import User
+from .models.course import Course
+from .models.enrollment import Enrollment
+from .models.enrollment_stats import CourseEnrollmentCount, DailyEnrollmentCount
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+# Built once and shared: compact output, no circular-reference bookkeeping
+_encoder = json.JSONEncoder(separators=(',', ':'), check_circular=False, default=_default)
+
+
+class Serializer:
+    """
+    Declares which fields of a model an endpoint exposes.
+
+    List endpoints select only these columns (`select()`) and get plain rows back,
+    skipping ORM hydration; `dump_many` turns them into dicts by zipping the rows
+    with the field names. Single objects (models or rows) go through `dump`.
+    """
+
+    def __init__(self, model, *fields):
+        self.model = model
+        self.fields = fields
+        self.columns = tuple(getattr(model, field) for field in fields)
+        self._values = attrgetter(*fields) if len(fields) > 1 else lambda obj: (getattr(obj, fields[0]),)
+
+    def select(self):
+        return select(*self.columns)
+
+    def dump(self, obj):
+        return dict(zip(self.fields, self._values(obj)))
+
+    def dump_many(self, rows):
+        fields = self.fields
+        if rows and isinstance(rows[0], Row):
+            # Fast path: rows are already tuples in field order
+            return [dict(zip(fields, row)) for row in rows]
+        return [dict(zip(fields, self._values(obj))) for obj in rows]
+
+    @staticmethod
+    def encode(data):
+        return _encoder.encode(data)
+
+
+class EnrollmentJoinSerializer:
+    """
+    Enrollment rows joined with a related model, dumped as
+    {'enrollment_id', 'enrollment_date', <name>: {...related fields}}.
+    """
+
+    def __init__(self, name, related):
+        self.name = name
+        self.related = related
+        self.columns = (Enrollment.id.label('enrollment_id'), Enrollment.enrollment_date, *related.columns)
+
+    def select(self):
+        return select(*self.columns)
+
+    def dump_many(self, rows):
+        name, fields = self.name, self.related.fields
+        return [
+            {'enrollment_id': row[0], 'enrollment_date': row[1], name: dict(zip(fields, row[2:]))}
+            for row in rows
+        ]
+
+    encode = staticmethod(Serializer.encode)
+
+
+user_serializer = Serializer(User, 'id', 'username', 'email')
+course_serializer = Serializer(Course, 'id', 'name', 'description')
+course_seats_serializer = Serializer(Course, 'id', 'capacity', 'seats_taken')
+enrollment_serializer = Serializer(Enrollment, 'id', 'user_id', 'course_id')
+
+schedule_serializer = EnrollmentJoinSerializer('course', course_serializer)
+roster_serializer = EnrollmentJoinSerializer('student', user_serializer)
+
+course_stats_serializer = Serializer(CourseEnrollmentCount, 'course_id', 'enrollments')
+daily_stats_serializer = Serializer(DailyEnrollmentCount, 'day', 'enrollments')
@@ -1,11 +1,130 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
 from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from functools import wraps
-from flask import jsonify
+from flask import g, jsonify
+from sqlalchemy import delete, select
+from sqlalchemy.orm import make_transient_to_detached
 from ..models.user import User, db
+from ..models.revoked_token import RevokedToken
+from ..extensions import principal_cache
+from ..database import after_commit, insert_ignoring_duplicates
+from ..routing import primary
+
+# Expiry used for tokens issued without one (JWT_*_TOKEN_EXPIRES = False): 9999-01-01
+NEVER_EXPIRES = 253370764800.0
+
+# Key in `g` of the user a POST /batch was authenticated as, while its sub-requests run
+BATCH_PRINCIPAL = '_batch_principal'
+
+
+class TokenBlocklist:
+    """
+    Revoked token JTIs kept in memory as {jti: expiry}, so the check on every
+    request is a dict lookup. Entries are dropped once the token expires, since
+    an expired token is rejected anyway.
+
+    Revocations are persisted in the revoked_token table. Each process loads
+    the table lazily and then picks up rows written by other processes every
+    BLOCKLIST_SYNC_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self.sync_interval = 5
+        self._revoked = {}
+        self._expiries = []  # heap of (expiry, jti)
+        self._last_id = 0
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.sync_interval = app.config.setdefault('BLOCKLIST_SYNC_INTERVAL', self.sync_interval)
+        with self._lock:
+            self._revoked.clear()
+            self._expiries.clear()
+            self._last_id = 0
+            self._next_sync = 0.0
+
+    def is_revoked(self, jti):
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token until `expires_at` (a UNIX timestamp, as in the JWT `exp` claim).
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.session.execute(
+            insert_ignoring_duplicates(RevokedToken, ['jti']).values(
+                jti=jti, expires_at=datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None)
+            )
+        )
+        # Revocation is rare, so this is a cheap moment to drop rows that no longer matter
+        db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+        db.session.commit()
+        after_commit(lambda: self._add(jti, expires_at))
+
+    @primary
+    def sync(self):
+        """
+        Load revocations persisted since the last sync (by this or another process).
+        Reads the primary: a lagging replica would accept revoked tokens for longer, and
+        could hide a row below the `_last_id` high-water mark for good.
+        """
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is already syncing
+        try:
+            self._next_sync = time.monotonic() + self.sync_interval
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            rows = db.session.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                .where(RevokedToken.id > self._last_id, RevokedToken.expires_at > now)
+                .order_by(RevokedToken.id)
+            ).all()
+        finally:
+            self._lock.release()
+
+        for row in rows:
+            self._last_id = max(self._last_id, row.id)
+            self._add(row.jti, row.expires_at.replace(tzinfo=timezone.utc).timestamp())
+
+    def _add(self, jti, expires_at):
+        with self._lock:
+            self._revoked[jti] = expires_at
+            heapq.heappush(self._expiries, (expires_at, jti))
+
+            now = time.time()
+            while self._expiries and self._expiries[0][0] <= now:
+                _, expired = heapq.heappop(self._expiries)
+                if self._revoked.get(expired, now + 1) <= now:
+                    del self._revoked[expired]
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+token_blocklist = TokenBlocklist()
+
 
 class AuthService:
+    """
+    Token issuing and route protection. One instance is shared by every controller;
+    the JWTManager is only created when `init_app` binds it to an app.
+    """
+
     def __init__(self, app=None):
-        self.jwt = JWTManager(app)  # Initialize JWT Manager with the Flask app
+        self.jwt = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.jwt = JWTManager(app)
+        self.jwt.token_in_blocklist_loader(self.is_token_revoked)
+        token_blocklist.init_app(app)
 
     def generate_tokens(self, user):
         """
@@ -15,19 +134,57 @@ class AuthService:
         refresh_token = create_refresh_token(identity=user.id)
         return {'access_token': access_token, 'refresh_token': refresh_token}
 
+    @staticmethod
+    def revoke_token(jwt_payload):
+        """
+        Revoke the token described by the decoded JWT payload until it expires.
+        """
+        token_blocklist.revoke(jwt_payload['jti'], jwt_payload.get('exp', NEVER_EXPIRES))
+
+    @staticmethod
+    def is_token_revoked(jwt_header, jwt_payload):
+        return token_blocklist.is_revoked(jwt_payload['jti'])
+
+    @staticmethod
+    def load_user(user_id):
+        """
+        Return the user for a JWT identity, served from the principal cache when possible.
+        """
+        cached = principal_cache.get(user_id)
+        if cached is not None:
+            # Attach the cached copy to this request's session without emitting a SELECT
+            return db.session.merge(cached, load=False)
+
+        user = db.session.get(User, user_id)
+        if user is not None:
+            snapshot = User(id=user.id, username=user.username, email=user.email)
+            make_transient_to_detached(snapshot)
+            principal_cache.set(user_id, snapshot)
+        return user
+
     def token_required(self, f):
-        @wraps(f)
         @jwt_required()  # This decorator ensures a valid JWT is present
-        def decorated(*args, **kwargs):
-            """
-            Protect routes by requiring a valid JWT. Fetches current user and passes to route.
-            """
+        def authenticated(*args, **kwargs):
             current_user_id = get_jwt_identity()
-            current_user = db.session.get(User, current_user_id)
+            current_user = self.load_user(current_user_id)
 
             if not current_user:
                 return jsonify({'message': 'Invalid user!'}), 403
 
             return f(current_user, *args, **kwargs)
 
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            """
+            Protect routes by requiring a valid JWT. Fetches current user and passes to route.
+            """
+            # Sub-requests of POST /batch reuse the user the batch was authenticated as
+            batch_user = g.get(BATCH_PRINCIPAL)
+            if batch_user is not None:
+                return f(batch_user, *args, **kwargs)
+            return authenticated(*args, **kwargs)
+
         return decorated
+
+
+auth_service = AuthService()
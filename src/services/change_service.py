@@ -0,0 +1,74 @@
+from sqlalchemy import select, text
+from ..models.change_log import ChangeLog, TRACKED_TABLES, CHANGE_LOG_DDL
+from ..extensions import db
+from ..routing import read_only
+from ..serializers import user_serializer, course_serializer, enrollment_serializer
+
+# Current state sent with every insert or update, per entity
+CHANGE_SERIALIZERS = {
+    'user': user_serializer,
+    'course': course_serializer,
+    'enrollment': enrollment_serializer,
+}
+
+
+class ChangeService:
+
+    @staticmethod
+    def is_supported():
+        # The change log is filled by SQLite triggers
+        return db.engine.dialect.name == 'sqlite'
+
+    @staticmethod
+    @read_only
+    def get_changes(since, limit, entities=None):
+        """
+        Up to `limit` changes made after cursor `since`, oldest first, as
+        {'version', 'entity', 'id', 'op', 'data'} dicts; 'data' is the row's current state
+        for upserts and None for deletes. The cursor of a change is its version.
+        """
+        query = (
+            select(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op)
+            .where(ChangeLog.id > since).order_by(ChangeLog.id).limit(limit)
+        )
+        if entities:
+            query = query.where(ChangeLog.entity.in_(entities))
+        entries = db.session.execute(query).all()
+
+        # One query per entity for the current rows of everything upserted in this page
+        current = {}
+        for entity, serializer in CHANGE_SERIALIZERS.items():
+            ids = [entry.entity_id for entry in entries if entry.entity == entity and entry.op == 'upsert']
+            if ids:
+                rows = db.session.execute(serializer.select().where(serializer.model.id.in_(ids))).all()
+                current[entity] = {row.id: data for row, data in zip(rows, serializer.dump_many(rows))}
+
+        changes = []
+        for version, entity, entity_id, op in entries:
+            data = current.get(entity, {}).get(entity_id) if op == 'upsert' else None
+            # A row deleted since the log was read is reported as deleted
+            changes.append({
+                'version': version, 'entity': entity, 'id': entity_id,
+                'op': op if data is not None else 'delete', 'data': data,
+            })
+        return changes
+
+    @staticmethod
+    def rebuild():
+        """
+        Create the change log triggers if missing (e.g. on a database created by
+        migrations) and add an entry for every row the log does not know yet.
+        Returns the number of entries added.
+        """
+        for statement in CHANGE_LOG_DDL:
+            db.session.execute(text(statement))
+
+        added = 0
+        for table in TRACKED_TABLES:
+            added += db.session.execute(text(
+                f"INSERT INTO change_log(entity, entity_id, op) "
+                f"SELECT '{table}', id, 'upsert' FROM \"{table}\" "
+                f"WHERE id NOT IN (SELECT entity_id FROM change_log WHERE entity = '{table}') ORDER BY id"
+            )).rowcount
+        db.session.commit()
+        return added
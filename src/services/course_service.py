@@ -1,19 +1,142 @@
-from ..models.course import Course
+import re
+from sqlalchemy import delete, func, literal_column, or_, select
+from ..models.course import Course, course_fts
+from ..models.enrollment import Enrollment
+from ..models.waitlist import WaitlistEntry
+from ..models.cache_version import CacheVersion
+from ..serializers import course_serializer, course_seats_serializer
 from ..extensions import db
+from ..routing import primary, read_only
+from ..database import insert_or_increment
+from .stats_service import StatsService
 from flask import jsonify, abort
 
+# response_cache key of the serialized GET /courses body
+CATALOG_CACHE_KEY = 'courses'
+
 class CourseService:
 
     @staticmethod
+    @primary
     def get_all_courses():
-        courses = Course.query.all()
+        # Fills the catalog cache, so it reads the primary: a body cached from a lagging
+        # replica would outlive the lag. Column-only query: rows come back as tuples
+        # without building Course objects
+        courses = db.session.execute(course_serializer.select().order_by(Course.id)).all()
         return courses
 
     @staticmethod
-    def create_new_course(data):
+    @primary
+    def get_catalog_version():
+        """
+        Current version of the catalog cached under CATALOG_CACHE_KEY.
+        """
+        version = db.session.scalar(select(CacheVersion.version).where(CacheVersion.key == CATALOG_CACHE_KEY))
+        return version or 0
+
+    @staticmethod
+    def bump_catalog_version():
+        # In the writer's transaction, so other processes see the new version with the change
+        db.session.execute(
+            insert_or_increment(CacheVersion, ['key'], 'version'),
+            {'key': CATALOG_CACHE_KEY, 'version': 1},
+        )
+
+    @staticmethod
+    @read_only
+    def get_courses_page(limit, after=None):
+        query = course_serializer.select().order_by(Course.id).limit(limit)
+        if after is not None:
+            query = query.where(Course.id > after)
+        return db.session.execute(query).all()
+
+    @staticmethod
+    @read_only
+    def iter_courses(batch_size=1000):
+        # yield_per fetches rows in batches instead of loading the whole table
+        query = course_serializer.select().order_by(Course.id).execution_options(yield_per=batch_size)
+        return db.session.execute(query)
+
+    @staticmethod
+    @read_only
+    def search_courses(q, limit, prefix=False):
+        """
+        Full-text search over course names and descriptions, best matches first.
+        With `prefix` the last word may be incomplete and only names are searched,
+        which is what keystroke autocomplete needs.
+        """
+        words = re.findall(r'\w+', q)
+        if not words:
+            return []
+
+        if db.engine.dialect.name != 'sqlite':
+            # No FTS5 outside SQLite: fall back to a substring match on the phrase
+            pattern = f"%{' '.join(words)}%"
+            query = course_serializer.select().where(
+                or_(Course.name.ilike(pattern), Course.description.ilike(pattern))
+            ).order_by(Course.id).limit(limit)
+            return db.session.execute(query).all()
+
+        # Quote every word so user input can't inject FTS5 query syntax
+        terms = [f'"{word}"' for word in words]
+        if prefix:
+            terms[-1] += '*'
+            match = f"name : ({' '.join(terms)})"
+        else:
+            match = ' '.join(terms)
+
+        query = (
+            course_serializer.select()
+            .join_from(course_fts, Course, Course.id == course_fts.c.rowid)
+            .where(course_fts.c.course_fts.op('MATCH')(match))
+            # bm25 ranks lower as better; a hit in the name weighs 10x one in the description
+            .order_by(func.bm25(literal_column('course_fts'), 10.0, 1.0))
+            .limit(limit)
+        )
+        return db.session.execute(query).all()
+
+    @staticmethod
+    @read_only
+    def get_seats(course_id):
+        """
+        (course seats row, waitlist length) for a course, or None if it does not exist.
+        """
+        waitlisted = select(func.count()).where(WaitlistEntry.course_id == course_id).scalar_subquery()
+        row = db.session.execute(
+            course_seats_serializer.select().add_columns(waitlisted).where(Course.id == course_id)
+        ).first()
+        if row is None:
+            return None
+        return row, row[-1]
+
+    @staticmethod
+    def create_new_course(name, description, capacity=None):
         
-        new_course = Course(name=data['name'], description=data['description'])
+        new_course = Course(name=name, description=description, capacity=capacity)
         db.session.add(new_course)
+        CourseService.bump_catalog_version()
         db.session.commit()
 
         return new_course
+
+    @staticmethod
+    def delete_courses(ids=None, name_prefix=None):
+        """
+        Delete the courses matching every given filter with one DELETE statement; their
+        enrollments are removed by the database (ON DELETE CASCADE).
+        Returns the ids of the deleted courses.
+        """
+        criteria = []
+        if ids is not None:
+            criteria.append(Course.id.in_(ids))
+        if name_prefix is not None:
+            criteria.append(Course.name.startswith(name_prefix, autoescape=True))
+
+        # The cascade bypasses EnrollmentService, so count the removals here
+        StatsService.record_removals_where(Enrollment.course_id.in_(select(Course.id).where(*criteria)))
+        stmt = delete(Course).where(*criteria).returning(Course.id).execution_options(synchronize_session=False)
+        deleted = db.session.scalars(stmt).all()
+        if deleted:
+            CourseService.bump_catalog_version()
+        db.session.commit()
+        return deleted
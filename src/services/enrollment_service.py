@@ -1,22 +1,328 @@
+from collections import Counter
+
+from sqlalchemy import case, delete, func, or_, select, tuple_, update
 from ..models.enrollment import Enrollment
+from ..models.user import User
+from ..models.course import Course
+from ..models.waitlist import WaitlistEntry
 from ..extensions import db
+from ..routing import read_only
+from ..database import insert_ignoring_duplicates
+from ..serializers import enrollment_serializer, roster_serializer, schedule_serializer
+from .stats_service import StatsService
+from .write_queue import write_queue
+
+ENROLLMENT_COLUMNS = (Enrollment.id, Enrollment.user_id, Enrollment.course_id, Enrollment.enrollment_date)
+ENROLLMENT_KEY = ['user_id', 'course_id']
+
+# A course with a seat left; used as the condition of the seat-taking UPDATE
+HAS_FREE_SEAT = or_(Course.capacity.is_(None), Course.seats_taken < Course.capacity)
+
+# One row per enrollment for registrar exports, joined with its user and course
+EXPORT_COLUMNS = (
+    Enrollment.id.label('enrollment_id'),
+    User.id.label('user_id'),
+    User.username,
+    User.email,
+    Course.id.label('course_id'),
+    Course.name.label('course_name'),
+    Enrollment.enrollment_date,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
 
 class EnrollmentService:
 
     @staticmethod
     def enroll_user_in_course(user_id, course_id):
-        enrollment = Enrollment(user_id=user_id, course_id=course_id)
-        db.session.add(enrollment)
+        """
+        Enroll a user in a course, returning (enrollment row, created). Enrolling twice
+        is harmless: the unique index turns the retry into a no-op and the existing row
+        is returned with created False. If the course is full the user joins its
+        waitlist and the row is None.
+        """
+        return write_queue.execute(EnrollmentService._enroll, user_id, course_id)
+
+    @staticmethod
+    def _enroll(user_id, course_id):
+        # Take a seat with one conditional UPDATE: concurrent enrollments cannot overbook
+        seat = db.session.execute(
+            update(Course).where(Course.id == course_id, HAS_FREE_SEAT)
+            .values(seats_taken=Course.seats_taken + 1)
+            .returning(Course.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if seat is None:
+            # Full (an unknown course fails the waitlist's foreign key instead)
+            enrollment = EnrollmentService._find(user_id, course_id)
+            if enrollment is None:
+                db.session.execute(
+                    insert_ignoring_duplicates(WaitlistEntry, ENROLLMENT_KEY).values(user_id=user_id, course_id=course_id)
+                )
+            return enrollment, False
+
+        stmt = insert_ignoring_duplicates(Enrollment, ENROLLMENT_KEY).values(user_id=user_id, course_id=course_id)
+        enrollment = db.session.execute(stmt.returning(*ENROLLMENT_COLUMNS)).first()
+
+        if enrollment is None:
+            # Only reached on a duplicate, never on the normal path: give the seat back
+            EnrollmentService.adjust_seats({course_id: -1})
+            return EnrollmentService._find(user_id, course_id), False
+
+        StatsService.record_enrollments([enrollment])
+        return enrollment, True
+
+    @staticmethod
+    def _find(user_id, course_id):
+        return db.session.execute(
+            select(*ENROLLMENT_COLUMNS).filter_by(user_id=user_id, course_id=course_id)
+        ).first()
+
+    @staticmethod
+    def waitlist_position(user_id, course_id):
+        """
+        1-based position of the user in the course's waitlist, or None if not waitlisted.
+        """
+        entry_id = select(WaitlistEntry.id).filter_by(user_id=user_id, course_id=course_id).scalar_subquery()
+        position = db.session.scalar(
+            select(func.count()).where(WaitlistEntry.course_id == course_id, WaitlistEntry.id <= entry_id)
+        )
+        return position or None
+
+    @staticmethod
+    def bulk_enroll(pairs):
+        """
+        Enroll a list of (user_id, course_id) pairs in a single transaction.
+        Unknown users and courses are reported per item instead of failing the batch,
+        pairs that are already enrolled are returned as they are, and pairs that find
+        their course full are waitlisted (status 202).
+        Returns one result dict per pair, in the same order.
+        """
+        user_ids = {user_id for user_id, _ in pairs}
+        course_ids = {course_id for _, course_id in pairs}
+        known_users = set(db.session.scalars(select(User.id).where(User.id.in_(user_ids))))
+        known_courses = set(db.session.scalars(select(Course.id).where(Course.id.in_(course_ids))))
+
+        results = [None] * len(pairs)
+        pending = {}
+        for index, (user_id, course_id) in enumerate(pairs):
+            if user_id not in known_users:
+                results[index] = {'status': 404, 'error': 'User not found'}
+            elif course_id not in known_courses:
+                results[index] = {'status': 404, 'error': 'Course not found'}
+            else:
+                pending.setdefault((user_id, course_id), []).append(index)
+
+        if pending:
+            existing = EnrollmentService._existing_ids(list(pending))
+            granted, waitlisted = EnrollmentService._take_seats([pair for pair in pending if pair not in existing])
+
+            created = {}
+            if granted:
+                # One executemany-style INSERT for the whole batch; duplicates are skipped
+                rows = [{'user_id': user_id, 'course_id': course_id} for user_id, course_id in granted]
+                stmt = insert_ignoring_duplicates(Enrollment, ENROLLMENT_KEY).returning(*ENROLLMENT_COLUMNS)
+                inserted = db.session.execute(stmt, rows).all()
+                StatsService.record_enrollments(inserted)
+                created = {(row.user_id, row.course_id): row.id for row in inserted}
+
+                # Enrolled by someone else since the lookup above: return their seats
+                raced = [pair for pair in granted if pair not in created]
+                if raced:
+                    EnrollmentService.release_seats(Counter(course_id for _, course_id in raced))
+                    existing.update(EnrollmentService._existing_ids(raced))
+
+            if waitlisted:
+                db.session.execute(
+                    insert_ignoring_duplicates(WaitlistEntry, ENROLLMENT_KEY),
+                    [{'user_id': user_id, 'course_id': course_id} for user_id, course_id in waitlisted],
+                )
+
+            for pair, indexes in pending.items():
+                if pair in created:
+                    result = {'status': 201, 'id': created[pair]}
+                elif pair in existing:
+                    result = {'status': 200, 'id': existing[pair]}
+                else:
+                    result = {'status': 202, 'waitlisted': True}
+                for index in indexes:
+                    results[index] = {**result, 'user_id': pair[0], 'course_id': pair[1]}
+
         db.session.commit()
-        return enrollment
+        return results
+
+    @staticmethod
+    def _existing_ids(pairs):
+        return {(row.user_id, row.course_id): row.id for row in db.session.execute(
+            select(Enrollment.id, Enrollment.user_id, Enrollment.course_id)
+            .where(tuple_(Enrollment.user_id, Enrollment.course_id).in_(pairs))
+        )}
+
+    @staticmethod
+    def _take_seats(pairs):
+        """
+        Take seats for (user_id, course_id) pairs, first come first served within each
+        course. Returns (pairs that got a seat, pairs for the waitlist).
+        """
+        wanted = Counter(course_id for _, course_id in pairs)
+        available = {}
+        for course_id, count in wanted.items():
+            # The UPDATE locks the course row until commit, so the seats read here stay free
+            course = db.session.execute(
+                update(Course).where(Course.id == course_id)
+                .values(seats_taken=Course.seats_taken)
+                .returning(Course.capacity, Course.seats_taken)
+                .execution_options(synchronize_session=False)
+            ).one()
+            free = count if course.capacity is None else max(course.capacity - course.seats_taken, 0)
+            available[course_id] = min(count, free)
+
+        EnrollmentService.adjust_seats({course_id: n for course_id, n in available.items() if n})
+        granted, waitlisted = [], []
+        for pair in pairs:
+            if available[pair[1]]:
+                available[pair[1]] -= 1
+                granted.append(pair)
+            else:
+                waitlisted.append(pair)
+        return granted, waitlisted
+
+    @staticmethod
+    def adjust_seats(deltas):
+        """
+        Add {course_id: delta} to the courses' seats_taken, without checking capacity.
+        """
+        for course_id, delta in deltas.items():
+            db.session.execute(
+                update(Course).where(Course.id == course_id)
+                .values(seats_taken=Course.seats_taken + delta)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def seats_held(*criteria):
+        """
+        {course_id: number of enrollments} for the enrollments matching `criteria`,
+        e.g. to release their seats after a cascade removes them.
+        """
+        return dict(db.session.execute(
+            select(Enrollment.course_id, func.count()).where(*criteria).group_by(Enrollment.course_id)
+        ).all())
+
+    @staticmethod
+    def release_seats(freed):
+        """
+        Give back {course_id: seats} and fill the freed seats from each course's
+        waitlist, oldest entry first.
+        """
+        for course_id, count in freed.items():
+            # Locks the course row until commit, like _take_seats
+            course = db.session.execute(
+                update(Course).where(Course.id == course_id)
+                .values(seats_taken=case((Course.seats_taken > count, Course.seats_taken - count), else_=0))
+                .returning(Course.capacity, Course.seats_taken)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if course is not None:
+                EnrollmentService._promote(course_id, course.capacity, course.seats_taken)
+
+    @staticmethod
+    def _promote(course_id, capacity, seats_taken):
+        free = None if capacity is None else capacity - seats_taken
+        while free is None or free > 0:
+            head = select(WaitlistEntry.id).where(WaitlistEntry.course_id == course_id).order_by(WaitlistEntry.id)
+            if free is not None:
+                head = head.limit(free)
+            claimed = db.session.execute(
+                delete(WaitlistEntry).where(WaitlistEntry.id.in_(head))
+                .returning(WaitlistEntry.id, WaitlistEntry.user_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            if not claimed:
+                return
+
+            rows = [{'user_id': user_id, 'course_id': course_id} for _, user_id in sorted(claimed)]
+            stmt = insert_ignoring_duplicates(Enrollment, ENROLLMENT_KEY).returning(*ENROLLMENT_COLUMNS)
+            inserted = db.session.execute(stmt, rows).all()
+            StatsService.record_enrollments(inserted)
+            if inserted:
+                EnrollmentService.adjust_seats({course_id: len(inserted)})
+            if free is not None:
+                # Entries for users who had enrolled in the meantime used no seat; keep filling
+                free -= len(inserted)
     
     @staticmethod
+    @read_only
     def get_enrollments_for_user(user_id):
-        return Enrollment.query.filter_by(user_id=user_id).all()
+        query = enrollment_serializer.select().where(Enrollment.user_id == user_id).order_by(Enrollment.id)
+        return db.session.execute(query).all()
     
+    @staticmethod
+    @read_only
+    def get_user_schedule(user_id, limit, after=None):
+        """
+        A page of the user's enrollments with their courses, from a single JOIN.
+        """
+        query = (
+            schedule_serializer.select()
+            .select_from(Enrollment).join(Enrollment.course)
+            .where(Enrollment.user_id == user_id)
+            .order_by(Enrollment.id).limit(limit)
+        )
+        if after is not None:
+            query = query.where(Enrollment.id > after)
+        return db.session.execute(query).all()
+
+    @staticmethod
+    @read_only
+    def get_course_roster(course_id, limit, after=None):
+        """
+        A page of the course's enrollments with their students, from a single JOIN.
+        """
+        query = (
+            roster_serializer.select()
+            .select_from(Enrollment).join(Enrollment.user)
+            .where(Enrollment.course_id == course_id)
+            .order_by(Enrollment.id).limit(limit)
+        )
+        if after is not None:
+            query = query.where(Enrollment.id > after)
+        return db.session.execute(query).all()
+    
+    @staticmethod
+    @read_only
+    def iter_enrollment_export(since=None, batch_size=1000):
+        """
+        Every enrollment (made at or after `since`, if given) with its user and course,
+        from one joined query. yield_per streams the result through a server-side cursor.
+        """
+        query = (
+            select(*EXPORT_COLUMNS)
+            .select_from(Enrollment).join(Enrollment.user).join(Enrollment.course)
+            .order_by(Enrollment.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if since is not None:
+            query = query.where(Enrollment.enrollment_date >= since)
+        return db.session.execute(query)
+
     @staticmethod
     def remove_enrollment(enrollment_id):
-        enrollment = Enrollment.query.get(enrollment_id)
-        if enrollment:
-            db.session.delete(enrollment)
-            db.session.commit()
\ No newline at end of file
+        """
+        Delete an enrollment. Returns False if it did not exist.
+        """
+        return write_queue.execute(EnrollmentService._remove, enrollment_id)
+
+    @staticmethod
+    def _remove(enrollment_id):
+        # A single DELETE, without loading the enrollment first
+        stmt = (
+            delete(Enrollment).where(Enrollment.id == enrollment_id)
+            .returning(Enrollment.course_id, Enrollment.enrollment_date)
+            .execution_options(synchronize_session=False)
+        )
+        removed = db.session.execute(stmt).all()
+        StatsService.record_removals(removed)
+        if removed:
+            EnrollmentService.release_seats({removed[0].course_id: 1})
+        return bool(removed)
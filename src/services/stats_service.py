@@ -0,0 +1,140 @@
+from collections import Counter
+
+from sqlalchemy import delete, func, insert, select, update
+from ..models.course import Course
+from ..models.enrollment import Enrollment
+from ..models.enrollment_stats import CourseEnrollmentCount, DailyEnrollmentCount
+from ..extensions import db
+from ..routing import read_only
+from ..database import insert_or_increment
+from ..serializers import course_stats_serializer, daily_stats_serializer
+
+# UTC day of an enrollment, as a date on every backend (SQLite's date() returns text)
+ENROLLMENT_DAY = func.date(Enrollment.enrollment_date, type_=db.Date)
+
+
+class StatsService:
+    """
+    Enrollment counts per course and per day, kept in summary tables so dashboards
+    never aggregate the enrollment table. Writers call `record_enrollments` /
+    `record_removals` in the transaction that changes the enrollments.
+    """
+
+    @staticmethod
+    def record_enrollments(rows, sign=1):
+        """
+        Count new enrollments. `rows` have `course_id` and `enrollment_date` attributes.
+        """
+        by_course, by_day = Counter(), Counter()
+        for row in rows:
+            by_course[row.course_id] += sign
+            by_day[row.enrollment_date.date()] += sign
+        StatsService._apply(by_course, by_day)
+
+    @staticmethod
+    def record_removals(rows):
+        StatsService.record_enrollments(rows, sign=-1)
+
+    @staticmethod
+    def record_removals_where(*criteria):
+        """
+        Count the removal of the enrollments matching `criteria` before they are deleted
+        by a cascade (e.g. when their user or course is deleted).
+        """
+        rows = db.session.execute(
+            select(Enrollment.course_id, ENROLLMENT_DAY.label('day'), func.count().label('n'))
+            .where(*criteria).group_by(Enrollment.course_id, ENROLLMENT_DAY)
+        ).all()
+        by_course, by_day = Counter(), Counter()
+        for course_id, day, n in rows:
+            by_course[course_id] -= n
+            by_day[day] -= n
+        StatsService._apply(by_course, by_day)
+
+    @staticmethod
+    def _apply(by_course, by_day):
+        # One upsert per table adds the deltas to the stored counts
+        if not by_course:
+            return
+        db.session.execute(
+            insert_or_increment(CourseEnrollmentCount, ['course_id'], 'enrollments'),
+            [{'course_id': course_id, 'enrollments': n} for course_id, n in by_course.items()],
+        )
+        db.session.execute(
+            insert_or_increment(DailyEnrollmentCount, ['day'], 'enrollments'),
+            [{'day': day, 'enrollments': n} for day, n in by_day.items()],
+        )
+
+    @staticmethod
+    @read_only
+    def get_course_counts():
+        return db.session.execute(
+            course_stats_serializer.select()
+            .where(CourseEnrollmentCount.enrollments > 0)
+            .order_by(CourseEnrollmentCount.course_id)
+        ).all()
+
+    @staticmethod
+    @read_only
+    def get_daily_counts(start=None, end=None):
+        query = (
+            daily_stats_serializer.select()
+            .where(DailyEnrollmentCount.enrollments > 0)
+            .order_by(DailyEnrollmentCount.day)
+        )
+        if start is not None:
+            query = query.where(DailyEnrollmentCount.day >= start)
+        if end is not None:
+            query = query.where(DailyEnrollmentCount.day <= end)
+        return db.session.execute(query).all()
+
+    @staticmethod
+    def rebuild():
+        """
+        Recompute both summary tables, and every course's seats_taken, from the
+        enrollment table in one transaction.
+        """
+        db.session.execute(delete(CourseEnrollmentCount))
+        db.session.execute(delete(DailyEnrollmentCount))
+        db.session.execute(insert(CourseEnrollmentCount).from_select(
+            ['course_id', 'enrollments'],
+            select(Enrollment.course_id, func.count()).group_by(Enrollment.course_id),
+        ))
+        db.session.execute(insert(DailyEnrollmentCount).from_select(
+            ['day', 'enrollments'],
+            select(ENROLLMENT_DAY, func.count()).group_by(ENROLLMENT_DAY),
+        ))
+        db.session.execute(update(Course).values(seats_taken=(
+            select(func.count()).where(Enrollment.course_id == Course.id).scalar_subquery()
+        )))
+        db.session.commit()
+
+    @staticmethod
+    def check():
+        """
+        Compare the summary tables with a full aggregation of the enrollment table.
+        Returns {'courses': [...], 'daily': [...], 'seats': [...]} listing (key, expected, recorded)
+        mismatches; 'seats' compares each course's seats_taken.
+        """
+        def mismatches(expected, recorded):
+            expected, recorded = dict(expected), {key: n for key, n in recorded if n}
+            return [
+                (key, expected.get(key, 0), recorded.get(key, 0))
+                for key in sorted(expected.keys() | recorded.keys())
+                if expected.get(key, 0) != recorded.get(key, 0)
+            ]
+
+        return {
+            'courses': mismatches(
+                db.session.execute(select(Enrollment.course_id, func.count()).group_by(Enrollment.course_id)).all(),
+                db.session.execute(select(CourseEnrollmentCount.course_id, CourseEnrollmentCount.enrollments)).all(),
+            ),
+            'daily': mismatches(
+                db.session.execute(select(ENROLLMENT_DAY, func.count()).group_by(ENROLLMENT_DAY)).all(),
+                db.session.execute(select(DailyEnrollmentCount.day, DailyEnrollmentCount.enrollments)).all(),
+            ),
+            'seats': mismatches(
+                db.session.execute(select(Enrollment.course_id, func.count()).group_by(Enrollment.course_id)).all(),
+                db.session.execute(select(Course.id, Course.seats_taken)).all(),
+            ),
+        }
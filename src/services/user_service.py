@@ -1,19 +1,69 @@
+from sqlalchemy import delete, select
 from ..models.user import User
-from ..extensions import db
+from ..models.enrollment import Enrollment
+from ..serializers import user_serializer
+from ..extensions import db, principal_cache
+from ..routing import read_only
+from ..database import after_commit
+from .stats_service import StatsService
+from .enrollment_service import EnrollmentService
 # from flask import jsonify, abort
 
 class UserService:
 
     @staticmethod
+    @read_only
     def get_all_users():
-        users = User.query.all()
+        # Column-only query: rows come back as tuples without building User objects
+        users = db.session.execute(user_serializer.select().order_by(User.id)).all()
         return users
 
+    @staticmethod
+    @read_only
+    def get_users_page(limit, after=None):
+        query = user_serializer.select().order_by(User.id).limit(limit)
+        if after is not None:
+            query = query.where(User.id > after)
+        return db.session.execute(query).all()
+
+    @staticmethod
+    @read_only
+    def iter_users(batch_size=1000):
+        # yield_per fetches rows in batches instead of loading the whole table
+        query = user_serializer.select().order_by(User.id).execution_options(yield_per=batch_size)
+        return db.session.execute(query)
+
     @staticmethod
     def create_new_user(username, email):
 
         new_user = User(username=username, email=email)
         db.session.add(new_user)
         db.session.commit()
+        after_commit(lambda: principal_cache.invalidate(new_user.id))
 
         return new_user
+
+    @staticmethod
+    def delete_users(ids=None, email_domain=None):
+        """
+        Delete the users matching every given filter with one DELETE statement; their
+        enrollments are removed by the database (ON DELETE CASCADE).
+        Returns the ids of the deleted users.
+        """
+        criteria = []
+        if ids is not None:
+            criteria.append(User.id.in_(ids))
+        if email_domain is not None:
+            criteria.append(User.email.endswith(f'@{email_domain}', autoescape=True))
+
+        # The cascade bypasses EnrollmentService, so count the removals and free the seats here
+        held_by_users = Enrollment.user_id.in_(select(User.id).where(*criteria))
+        StatsService.record_removals_where(held_by_users)
+        freed = EnrollmentService.seats_held(held_by_users)
+        stmt = delete(User).where(*criteria).returning(User.id).execution_options(synchronize_session=False)
+        deleted = db.session.scalars(stmt).all()
+        EnrollmentService.release_seats(freed)
+        db.session.commit()
+        for user_id in deleted:
+            after_commit(lambda user_id=user_id: principal_cache.invalidate(user_id))
+        return deleted
@@ -0,0 +1,123 @@
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from ..extensions import db
+
+
+class GroupCommitQueue:
+    """
+    Optional single-writer queue for hot write paths.
+
+    Callers hand a write operation (a function that changes the session but does
+    not commit) to `execute`. When group commit is enabled, one writer thread
+    drains the queue and runs up to GROUP_COMMIT_MAX_BATCH queued operations,
+    waiting at most GROUP_COMMIT_MAX_WAIT_MS for more to arrive, in one
+    transaction. Every caller gets its own result or exception back once that
+    transaction has committed, so durability is unchanged, but concurrent writers
+    stop competing for SQLite's database lock and pay for one commit per group.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.max_batch = 200
+        self.max_wait = 0.005
+        self.timeout = 30
+        self.commits = 0
+        self._app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def init_app(self, app):
+        self.stop()
+        self._app = app
+        self.enabled = app.config.setdefault('ENROLLMENT_GROUP_COMMIT', self.enabled)
+        self.max_batch = app.config.setdefault('GROUP_COMMIT_MAX_BATCH', self.max_batch)
+        self.max_wait = app.config.setdefault('GROUP_COMMIT_MAX_WAIT_MS', self.max_wait * 1000) / 1000
+        self.timeout = app.config.setdefault('GROUP_COMMIT_TIMEOUT', self.timeout)
+        self.commits = 0
+
+    def execute(self, operation, *args):
+        """
+        Run `operation(*args)` and commit, either inline or through the writer thread.
+        """
+        if not self.enabled or db.session.info.get('defer_commit'):
+            # Inline; inside deferred_commits() the operation joins the caller's transaction
+            try:
+                result = operation(*args)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            return result
+        return self.submit(operation, *args).result(timeout=self.timeout)
+
+    def submit(self, operation, *args):
+        future = Future()
+        self._ensure_started()
+        self._queue.put((operation, args, future))
+        return future
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_started(self):
+        # Started on first use, so worker processes forked after create_app get their own thread
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        with self._app.app_context():
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+
+                batch = [item]
+                deadline = time.monotonic() + self.max_wait
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.put(None)  # finish this group, then stop
+                        break
+                    batch.append(item)
+
+                self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            results = [operation(*args) for operation, args, _ in batch]
+            db.session.commit()
+            self.commits += 1
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                batch[0][2].set_exception(e)
+                return
+            # Retry one by one so a single bad operation only fails its own caller
+            for item in batch:
+                self._commit([item])
+            return
+        finally:
+            db.session.expunge_all()
+
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+write_queue = GroupCommitQueue()
@@ -6,10 +6,8 @@ from flask_jwt_extended import create_access_token
 
 @pytest.fixture
 def app():
-    app = create_app()
-
     # Configure the app to use an in-memory SQLite database for tests
-    app.config.update({
+    app = create_app({
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
     })
@@ -0,0 +1,92 @@
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from src import create_app
+from src.extensions import db
+from src.models.user import User
+
+
+def _app(**config):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        **config,
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([User(username='alice', email='a@example.com'), User(username='bob', email='b@example.com')])
+        db.session.commit()
+        tokens = [create_access_token(identity=1), create_access_token(identity=2)]
+    return app, [{"Authorization": f"Bearer {token}"} for token in tokens]
+
+
+def test_rate_limit_is_per_user():
+    app, (alice, bob) = _app(ADMISSION_RATE_LIMITS={'user_bp': (0.001, 2)})
+    client = app.test_client()
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    assert [client.get('/users', headers=alice).status_code for _ in range(2)] == [200, 200]
+    before = len(statements)
+    response = client.get('/users', headers=alice)
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert len(statements) == before  # rejected before any database work
+    assert client.get('/users', headers=bob).status_code == 200
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'admission_shed_requests_total{blueprint="user_bp",reason="rate_limited"} 1' in body
+
+
+def test_batch_sub_requests_are_charged_to_their_blueprint():
+    app, (alice, _) = _app(ADMISSION_RATE_LIMITS={'user_bp': (0.001, 2), 'batch_bp': (10, 10)})
+    client = app.test_client()
+
+    response = client.post('/batch', json=[{'path': '/users'}] * 5, headers=alice)
+
+    assert response.status_code == 207
+    assert [result['status'] for result in response.json] == [200, 200, 429, 429, 429]
+    assert client.get('/users', headers=alice).status_code == 429
+
+
+def test_login_is_limited_by_client_ip():
+    app, _ = _app(ADMISSION_RATE_LIMITS={'auth_bp': (0.001, 1)})
+    client = app.test_client()
+
+    assert client.post('/login', json={'username': 'alice'}).status_code == 200
+    assert client.post('/login', json={'username': 'bob'}).status_code == 429
+    other = client.post('/login', json={'username': 'bob'}, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert other.status_code == 200
+
+
+def test_login_limit_uses_forwarded_client_behind_trusted_proxy():
+    app, _ = _app(ADMISSION_RATE_LIMITS={'auth_bp': (0.001, 1)}, TRUSTED_PROXY_COUNT=1)
+    client = app.test_client()
+    proxy = {'REMOTE_ADDR': '10.0.0.1'}
+
+    def login(client_ip):
+        return client.post('/login', json={'username': 'alice'}, environ_base=proxy,
+                           headers={'X-Forwarded-For': client_ip}).status_code
+
+    assert login('203.0.113.1') == 200
+    assert login('203.0.113.1') == 429
+    assert login('203.0.113.2') == 200
+
+
+def test_concurrency_limit_sheds_with_503():
+    app, (alice, _) = _app(ADMISSION_MAX_CONCURRENT=1)
+    client = app.test_client()
+
+    @app.route('/nested')
+    def nested():
+        # Issued while this request still holds the only slot
+        return str(client.get('/users', headers=alice).status_code)
+
+    assert client.get('/nested').get_data(as_text=True) == '503'
+    response = client.get('/users', headers=alice)
+    assert response.status_code == 200
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'admission_shed_requests_total{blueprint="user_bp",reason="overloaded"} 1' in body
+    assert 'admission_in_flight_requests 0' in body
@@ -0,0 +1,33 @@
+from sqlalchemy import text
+from src import create_app
+from src.config import Config
+from src.database import engine_options
+from src.extensions import db
+
+
+def test_create_app_applies_sqlite_pragmas(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}"})
+
+    with app.app_context():
+        # The test override is kept instead of being replaced by the default URI
+        assert db.engine.url.database == str(tmp_path / 'app.db')
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+
+
+def test_engine_options_from_config():
+    config = {
+        **{key: getattr(Config, key) for key in dir(Config) if key.isupper()},
+        "SQLALCHEMY_DATABASE_URI": "postgresql://localhost/app",
+        "DB_POOL_SIZE": 20,
+        "DB_MAX_OVERFLOW": 5,
+        "DB_POOL_RECYCLE": 1800,
+    }
+
+    assert engine_options(config) == {
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+        'pool_size': 20,
+        'max_overflow': 5,
+    }
@@ -0,0 +1,72 @@
+from sqlalchemy import event
+from src.extensions import db, principal_cache
+from src.services.user_service import UserService
+from src.services.auth_service import token_blocklist
+
+
+def test_principal_cache_skips_user_lookup(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    # The first request loads the user from the database and caches it
+    client.get('/users', headers=headers)
+    assert principal_cache.misses == 1
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    response = client.get('/users', headers=headers)
+
+    assert response.status_code == 200
+    assert principal_cache.hits == 1
+    # Only the user list query ran; the principal came from the cache
+    assert len(statements) == 1
+
+
+def test_user_write_invalidates_principal_cache(app, seed_user):
+    user, access_token = seed_user
+    principal_cache.set(2, object())
+
+    with app.app_context():
+        UserService.create_new_user('jane_doe', 'jane@example.com')
+
+    assert principal_cache.get(2) is None
+
+
+def test_logout_revokes_access_token(client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post('/logout', headers=headers)
+    assert response.status_code == 200
+
+    response = client.get('/users', headers=headers)
+    assert response.status_code == 401
+    assert response.json == {'msg': 'Token has been revoked'}
+
+
+def test_refresh_and_revoke_refresh_token(client, seed_user):
+    tokens = client.post('/login', json={'username': 'john_doe'}).json
+    refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+
+    response = client.post('/refresh', headers=refresh_headers)
+    assert response.status_code == 200
+    new_token = response.json['access_token']
+    assert client.get('/users', headers={"Authorization": f"Bearer {new_token}"}).status_code == 200
+
+    client.post('/logout', headers=refresh_headers)
+    assert client.post('/refresh', headers=refresh_headers).status_code == 401
+
+
+def test_blocklist_reloads_persisted_revocations(app, client, seed_user):
+    user, access_token = seed_user
+    client.post('/logout', headers={"Authorization": f"Bearer {access_token}"})
+
+    # A fresh process state (e.g. after a restart) reloads the revocation from the table
+    token_blocklist.init_app(app)
+    assert len(token_blocklist) == 0
+
+    response = client.get('/users', headers={"Authorization": f"Bearer {access_token}"})
+    assert response.status_code == 401
+    assert len(token_blocklist) == 1
@@ -0,0 +1,102 @@
+from src.admission import admission
+from src.extensions import db
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+from src.services.auth_service import auth_service
+
+
+def test_batch_runs_sub_requests(app, client, seed_user, monkeypatch):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with app.app_context():
+        db.session.add(Course(name='Course 1', description='D1'))
+        db.session.commit()
+    lookups = []
+    load_user = auth_service.load_user
+    monkeypatch.setattr(auth_service, 'load_user', lambda user_id: lookups.append(user_id) or load_user(user_id))
+
+    response = client.post('/batch', json=[
+        {'method': 'GET', 'path': '/users'},
+        {'method': 'POST', 'path': '/enroll', 'body': {'user_id': 1, 'course_id': 1}},
+        {'path': '/enrollments/1'},
+        {'path': '/courses?limit=1'},
+    ], headers=headers)
+
+    assert response.status_code == 200
+    statuses = [result['status'] for result in response.json]
+    assert statuses == [200, 201, 200, 200]
+    assert response.json[0]['body'] == [{'id': 1, 'username': 'john_doe', 'email': 'john@example.com'}]
+    assert response.json[2]['body'] == [{'id': 1, 'user_id': 1, 'course_id': 1}]
+    # Authenticated once for the whole batch
+    assert lookups == [1]
+
+
+def test_batch_reports_errors_per_sub_request(client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post('/batch', json=[
+        {'path': '/nowhere'},
+        {'method': 'PUT', 'path': '/users'},
+        {'method': 'POST', 'path': '/batch', 'body': []},
+        {'method': 'POST', 'path': '/courses', 'body': {'name': 'Course 1', 'description': 'D1'}},
+    ], headers=headers)
+
+    assert response.status_code == 207
+    assert [result['status'] for result in response.json] == [404, 405, 400, 201]
+    assert client.post('/batch', json={'requests': []}, headers=headers).status_code == 400
+    assert client.post('/batch', json=[{'path': '/users'}]).status_code == 401
+
+
+def test_atomic_batch_rolls_back_on_failure(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post('/batch', json={'atomic': True, 'requests': [
+        {'method': 'POST', 'path': '/courses', 'body': {'name': 'Course 1', 'description': 'D1'}},
+        {'method': 'POST', 'path': '/enroll', 'body': {'user_id': 1, 'course_id': 99}},
+        {'method': 'POST', 'path': '/courses', 'body': {'name': 'Course 2', 'description': 'D2'}},
+    ]}, headers=headers)
+
+    assert response.status_code == 207
+    assert [result['status'] for result in response.json] == [201, 404, 424]
+    with app.app_context():
+        assert db.session.query(Course).count() == 0
+
+    response = client.post('/batch', json={'atomic': True, 'requests': [
+        {'method': 'POST', 'path': '/courses', 'body': {'name': 'Course 1', 'description': 'D1'}},
+        {'method': 'POST', 'path': '/enroll', 'body': {'user_id': 1, 'course_id': 1}},
+    ]}, headers=headers)
+
+    assert response.status_code == 200
+    with app.app_context():
+        assert db.session.query(Enrollment).count() == 1
+
+
+
+def test_rolled_back_batch_does_not_reach_the_catalog_cache(client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post('/batch', json={'atomic': True, 'requests': [
+        {'method': 'POST', 'path': '/courses', 'body': {'name': 'Ghost', 'description': 'Rolled back'}},
+        {'method': 'GET', 'path': '/courses'},
+        {'method': 'POST', 'path': '/enroll', 'body': {}},
+    ]}, headers=headers)
+
+    assert response.status_code == 207
+    # The sub-request saw its own transaction's course, but nothing of it was cached
+    assert [course['name'] for course in response.json[1]['body']] == ['Ghost']
+    assert client.get('/courses', headers=headers).json == []
+    assert client.get('/courses?limit=5', headers=headers).json == []
+
+def test_batch_holds_one_admission_slot(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post('/batch', json=[{'path': '/users'}, {'path': '/metrics'}], headers=headers)
+
+    assert response.status_code == 200
+    # Finishing the first sub-request did not release the batch's slot
+    assert 'admission_in_flight_requests 1' in response.json[1]['body']
+    assert admission.in_flight == 0
@@ -0,0 +1,115 @@
+import threading
+
+from sqlalchemy import select
+
+from src import create_app
+from src.extensions import db
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+from src.models.user import User
+from src.models.waitlist import WaitlistEntry
+from src.services.enrollment_service import EnrollmentService
+from src.services.stats_service import StatsService
+
+
+def _seed(app, users, capacity):
+    with app.app_context():
+        db.session.add_all([User(username=f'user{i}', email=f'user{i}@example.com') for i in range(users)])
+        db.session.add(Course(name='Course 1', description='D1', capacity=capacity))
+        db.session.commit()
+
+
+def test_full_course_waitlists_and_promotes_in_order(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    _seed(app, 3, capacity=2)
+
+    statuses = [client.post('/enroll', json={'user_id': u, 'course_id': 1}, headers=headers) for u in (1, 2, 3, 4)]
+    assert [r.status_code for r in statuses] == [201, 201, 202, 202]
+    assert statuses[3].json == {'waitlisted': True, 'user_id': 4, 'course_id': 1, 'position': 2}
+    # Retrying is harmless either way
+    assert client.post('/enroll', json={'user_id': 1, 'course_id': 1}, headers=headers).status_code == 200
+    assert client.post('/enroll', json={'user_id': 3, 'course_id': 1}, headers=headers).json['position'] == 1
+    assert client.get('/courses/1/seats', headers=headers).json == {
+        'id': 1, 'capacity': 2, 'seats_taken': 2, 'waitlisted': 2,
+    }
+
+    # A freed seat goes to the head of the waitlist
+    assert client.delete(f"/enrollments/{statuses[0].json['id']}", headers=headers).status_code == 200
+    roster = client.get('/courses/1/students', headers=headers).json
+    assert [e['student']['id'] for e in roster] == [2, 3]
+
+    # Deleting an enrolled user frees their seat too
+    assert client.delete('/users/2', headers=headers).status_code == 200
+    assert [e['student']['id'] for e in client.get('/courses/1/students', headers=headers).json] == [3, 4]
+    assert client.get('/courses/1/seats', headers=headers).json['waitlisted'] == 0
+    with app.app_context():
+        assert StatsService.check() == {'courses': [], 'daily': [], 'seats': []}
+
+
+def test_batch_enroll_respects_capacity(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    _seed(app, 3, capacity=2)
+    client.post('/enroll', json={'user_id': 1, 'course_id': 1}, headers=headers)
+
+    response = client.post('/enroll/batch', json=[
+        {'user_id': 1, 'course_id': 1}, {'user_id': 2, 'course_id': 1},
+        {'user_id': 3, 'course_id': 1}, {'user_id': 4, 'course_id': 1},
+    ], headers=headers)
+
+    assert [r['status'] for r in response.json['results']] == [200, 201, 202, 202]
+    assert (response.json['created'], response.json['existing'], response.json['waitlisted']) == (1, 1, 2)
+    assert client.get('/courses/1/seats', headers=headers).json['seats_taken'] == 2
+
+
+def test_create_course_with_capacity(client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post('/courses', json={'name': 'C', 'description': 'D', 'capacity': 30}, headers=headers)
+    assert response.status_code == 201
+    assert client.get(f"/courses/{response.json['id']}/seats", headers=headers).json['capacity'] == 30
+    assert client.post('/courses', json={'name': 'C', 'description': 'D', 'capacity': -1}, headers=headers).status_code == 400
+    assert client.get('/courses/99/seats', headers=headers).status_code == 404
+
+
+def test_registration_rush_never_overbooks(tmp_path):
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'rush.db'}"})
+    with app.app_context():
+        db.create_all()
+    _seed(app, 60, capacity=10)
+    start = threading.Barrier(60)
+    errors, dropped = [], []
+
+    def worker(user_id):
+        start.wait()
+        try:
+            with app.app_context():
+                if user_id % 3:
+                    EnrollmentService.enroll_user_in_course(user_id, 1)
+                else:
+                    EnrollmentService.bulk_enroll([(user_id, 1)])
+                if user_id % 10 == 0:
+                    # Some students drop a course straight away, freeing seats mid-rush
+                    enrollment = db.session.execute(select(Enrollment.id).filter_by(user_id=user_id)).scalar()
+                    if enrollment is not None and EnrollmentService.remove_enrollment(enrollment):
+                        dropped.append(user_id)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in range(1, 61)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with app.app_context():
+        enrolled = set(db.session.scalars(select(Enrollment.user_id)))
+        waiting = set(db.session.scalars(select(WaitlistEntry.user_id)))
+        assert len(enrolled) == db.session.get(Course, 1).seats_taken == 10
+        # Every student ended up in exactly one place
+        assert not enrolled & waiting and not (enrolled | waiting) & set(dropped)
+        assert len(enrolled) + len(waiting) + len(dropped) == 60
+        assert StatsService.check() == {'courses': [], 'daily': [], 'seats': []}
@@ -0,0 +1,80 @@
+from src.extensions import db
+from src.models.user import User
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+
+
+def test_import_users_courses_and_enrollments(app, tmp_path):
+    users = tmp_path / 'users.csv'
+    users.write_text('username,email\njohn_doe,john@example.com\njane_doe,jane@example.com\n')
+    courses = tmp_path / 'courses.ndjson'
+    courses.write_text('{"name": "Course 1", "description": "D1"}\n{"name": "Course 2", "description": "D2"}\n')
+    enrollments = tmp_path / 'enrollments.csv'
+    enrollments.write_text('username,course\njohn_doe,Course 1\njane_doe,Course 2\njane_doe,Course 2\nghost,Course 1\n')
+
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['import', 'users', str(users)]).exit_code == 0
+    assert runner.invoke(args=['import', 'courses', str(courses)]).exit_code == 0
+    result = runner.invoke(args=['import', 'enrollments', str(enrollments), '--batch-size', '2'])
+
+    assert result.exit_code == 0
+    # The duplicate row is skipped by the unique index and the unknown user is reported
+    assert 'Imported 2 of 3 enrollments' in result.output
+    assert 'Skipped 1 enrollments' in result.output
+
+    with app.app_context():
+        assert db.session.query(User).count() == 2
+        assert db.session.query(Course).count() == 2
+        pairs = {(e.user.username, e.course.name) for e in db.session.query(Enrollment)}
+        assert pairs == {('john_doe', 'Course 1'), ('jane_doe', 'Course 2')}
+
+    # The import keeps the enrollment summary tables in step
+    result = runner.invoke(args=['check-enrollment-stats'])
+    assert result.exit_code == 0, result.output
+
+
+def test_import_courses_refreshes_cached_catalog(app, client, seed_user, tmp_path):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    courses = tmp_path / 'courses.csv'
+    courses.write_text('name,description\nCourse 1,D1\n')
+    first = client.get('/courses', headers=headers)
+
+    assert app.test_cli_runner().invoke(args=['import', 'courses', str(courses)]).exit_code == 0
+
+    # The catalog version is bumped in the database, so no process keeps serving its old copy
+    response = client.get('/courses', headers=headers | {'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert [course['name'] for course in response.json] == ['Course 1']
+
+
+def test_import_enrollments_by_id_skips_unknown_ids(app, seed_user, tmp_path):
+    with app.app_context():
+        db.session.add(Course(name='Course 1', description='D1'))
+        db.session.commit()
+    enrollments = tmp_path / 'enrollments.csv'
+    enrollments.write_text('user_id,course_id\n99,1\n1,x\n1,1\n1,42\n')
+
+    result = app.test_cli_runner().invoke(args=['import', 'enrollments', str(enrollments), '--batch-size', '1'])
+
+    # Unknown or malformed ids are reported like unknown names instead of failing the import
+    assert result.exit_code == 0, result.output
+    assert 'Imported 1 of 1 enrollments' in result.output
+    assert 'Skipped 3 enrollments' in result.output
+    with app.app_context():
+        assert [(e.user_id, e.course_id) for e in db.session.query(Enrollment)] == [(1, 1)]
+
+
+def test_import_courses_skips_existing_names(app, tmp_path):
+    courses = tmp_path / 'courses.csv'
+    courses.write_text('name,description\nCourse 1,D1\nCourse 2,D2\nCourse 1,Again\n')
+    runner = app.test_cli_runner()
+
+    first = runner.invoke(args=['import', 'courses', str(courses)])
+    second = runner.invoke(args=['import', 'courses', str(courses)])
+
+    assert 'Imported 2 of 2 courses' in first.output
+    assert 'Skipped 1 courses' in first.output
+    assert 'Imported 0 of 0 courses' in second.output
+    with app.app_context():
+        assert sorted(c.name for c in db.session.query(Course)) == ['Course 1', 'Course 2']
@@ -0,0 +1,64 @@
+import gzip
+import json
+
+import src.cache
+from src.extensions import db
+from src.models.course import Course
+from src.models.user import User
+
+
+def _seed(app, model, count, **fields):
+    with app.app_context():
+        db.session.add_all([model(**{k: f'{v}{i}' for k, v in fields.items()}) for i in range(count)])
+        db.session.commit()
+
+
+def test_large_list_is_gzipped(app, client, seed_user):
+    user, access_token = seed_user
+    _seed(app, User, 200, username='user', email='user@example.com')
+    headers = {"Authorization": f"Bearer {access_token}", "Accept-Encoding": "gzip"}
+
+    response = client.get('/users', headers=headers)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(json.loads(gzip.decompress(response.data))) == 201
+
+    # Below the size threshold, or without Accept-Encoding, the body is sent as is
+    small = client.get('/users?limit=1', headers=headers)
+    plain = client.get('/users', headers={"Authorization": f"Bearer {access_token}"})
+    assert 'Content-Encoding' not in small.headers
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.json) == 201
+
+
+def test_streamed_list_is_gzipped(app, client, seed_user):
+    user, access_token = seed_user
+    _seed(app, User, 50, username='user', email='user@example.com')
+    app.config['API_STREAM_BATCH_SIZE'] = 10
+
+    response = client.get('/users?stream=1', headers={"Authorization": f"Bearer {access_token}", "Accept-Encoding": "gzip"})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert len(json.loads(gzip.decompress(response.data))) == 51
+
+
+def test_cached_catalog_is_compressed_once(app, client, seed_user, monkeypatch):
+    user, access_token = seed_user
+    _seed(app, Course, 100, name='Course ', description='A long enough description ')
+    calls = []
+    original = src.cache.gzip_bytes
+    monkeypatch.setattr(src.cache, 'gzip_bytes', lambda data, level: calls.append(level) or original(data, level))
+    headers = {"Authorization": f"Bearer {access_token}", "Accept-Encoding": "gzip"}
+
+    first = client.get('/courses', headers=headers)
+    second = client.get('/courses', headers=headers)
+
+    assert first.data == second.data
+    assert len(json.loads(gzip.decompress(second.data))) == 100
+    assert calls == [6]
+    assert first.headers['ETag'].endswith('-gzip"')
+
+    revalidated = client.get('/courses', headers={**headers, "If-None-Match": first.headers['ETag']})
+    assert revalidated.status_code == 304
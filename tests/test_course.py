@@ -1,4 +1,9 @@
 from unittest.mock import patch, MagicMock
+from sqlalchemy import event, text
+from src.extensions import db
+from src.models.course import Course, SEARCH_INDEX_DROP_DDL
+from src.models.enrollment import Enrollment
+from src.models.user import User
 from src.services.course_service import CourseService
 
 # Mock the GET /courses route
@@ -77,4 +82,128 @@ def test_create_course(mock_create_new_course, client, seed_user):
     }
 
     # Ensure the create_new_course method was called with the correct data
-    mock_create_new_course.assert_called_once_with('New Course', 'New Description')
+    mock_create_new_course.assert_called_once_with('New Course', 'New Description', capacity=None)
+
+
+@patch.object(CourseService, 'get_all_courses')
+def test_get_courses_served_from_cache(mock_get_all_courses, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    mock_get_all_courses.return_value = [MagicMock(id=1, description='Description 1')]
+    mock_get_all_courses.return_value[0].name = 'Course 1'
+
+    first = client.get('/courses', headers=headers)
+    second = client.get('/courses', headers=headers)
+
+    # The second response is the cached body, and the database was queried once
+    assert second.data == first.data
+    assert mock_get_all_courses.call_count == 1
+
+    # A client holding the current ETag gets a 304 without a body
+    etag = first.headers['ETag']
+    response = client.get('/courses', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_create_course_invalidates_catalog_cache(client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    etag = client.get('/courses', headers=headers).headers['ETag']
+    client.post('/courses', json={'name': 'Course 1', 'description': 'Description 1'}, headers=headers)
+    response = client.get('/courses', headers={**headers, 'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.json == [{'id': 1, 'name': 'Course 1', 'description': 'Description 1'}]
+
+
+def test_search_courses_ranked_and_in_sync(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with app.app_context():
+        CourseService.create_new_course('Advanced Web Development', 'Flask, REST and databases')
+        CourseService.create_new_course('Databases', 'Relational design and SQL')
+        CourseService.create_new_course('Operating Systems', 'Processes and threads')
+
+    # A match in the name ranks above a match in the description
+    response = client.get('/courses/search?q=databases', headers=headers)
+    assert response.status_code == 200
+    assert [c['name'] for c in response.json] == ['Databases', 'Advanced Web Development']
+
+    # Prefix mode completes the last word against course names only
+    response = client.get('/courses/search?q=advanced web d&prefix=1', headers=headers)
+    assert [c['name'] for c in response.json] == ['Advanced Web Development']
+
+    # Updates and deletes reach the index through the triggers
+    with app.app_context():
+        db.session.get(Course, 2).name = 'Data Systems'
+        db.session.delete(db.session.get(Course, 1))
+        db.session.commit()
+    response = client.get('/courses/search?q=data&prefix=1', headers=headers)
+    assert [c['name'] for c in response.json] == ['Data Systems']
+
+
+def test_search_courses_requires_query(client, seed_user):
+    user, access_token = seed_user
+
+    response = client.get('/courses/search?q=', headers={"Authorization": f"Bearer {access_token}"})
+
+    assert response.status_code == 400
+
+
+def test_rebuild_search_index_command(app, client, seed_user):
+    user, access_token = seed_user
+    with app.app_context():
+        # Simulate a database created without the index (e.g. by a migration)
+        for statement in SEARCH_INDEX_DROP_DDL:
+            db.session.execute(text(statement))
+        db.session.execute(text("INSERT INTO course (name, description) VALUES ('Compilers', 'Parsing')"))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['rebuild-search-index'])
+
+    assert result.exit_code == 0
+    response = client.get('/courses/search?q=compilers', headers={"Authorization": f"Bearer {access_token}"})
+    assert [c['name'] for c in response.json] == ['Compilers']
+
+
+def test_delete_course_cascades_in_one_statement(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with app.app_context():
+        CourseService.create_new_course('Course 1', 'Description 1')
+        db.session.add_all([User(username=f'user{i}', email=f'user{i}@example.com') for i in range(10)])
+        db.session.flush()
+        db.session.add_all([Enrollment(user_id=i, course_id=1) for i in range(1, 12)])
+        db.session.commit()
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    response = client.delete('/courses/1', headers=headers)
+
+    assert response.status_code == 200
+    # The enrollments go with the course through ON DELETE CASCADE, not one DELETE each
+    assert len([s for s in statements if s.startswith('DELETE')]) == 1
+    with app.app_context():
+        assert db.session.query(Enrollment).count() == 0
+    assert client.delete('/courses/1', headers=headers).status_code == 404
+
+
+def test_bulk_delete_courses_by_name_prefix(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with app.app_context():
+        CourseService.create_new_course('CSCI 1000', 'Intro')
+        CourseService.create_new_course('CSCI 2000', 'Data structures')
+        CourseService.create_new_course('MATH 1000', 'Calculus')
+
+    assert client.delete('/courses', headers=headers).status_code == 400
+    assert client.delete('/courses', json={'ids': [True]}, headers=headers).status_code == 400
+
+    response = client.delete('/courses?name_prefix=CSCI', headers=headers)
+
+    assert response.json == {'deleted': 2, 'ids': [1, 2]}
+    assert [c['name'] for c in client.get('/courses', headers=headers).json] == ['MATH 1000']
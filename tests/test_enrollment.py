@@ -1,5 +1,10 @@
 from unittest.mock import patch, MagicMock
 from src.services.enrollment_service import EnrollmentService
+from sqlalchemy import event
+from src.extensions import db
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+from src.models.user import User
 
 # Mock the GET /enrollments/<user_id> route
 @patch.object(EnrollmentService, 'get_enrollments_for_user')
@@ -43,7 +48,7 @@ def test_enroll_user(mock_enroll_user_in_course, client, seed_user):
     mock_enrollment.course_id = 1
 
     # Mock the return value for enroll_user_in_course
-    mock_enroll_user_in_course.return_value = mock_enrollment
+    mock_enroll_user_in_course.return_value = (mock_enrollment, True)
 
     # Create the payload to send to the POST request
     enrollment_data = {
@@ -94,3 +99,157 @@ def test_remove_enrollment(mock_remove_enrollment, client, seed_user):
 
     # Ensure the remove_enrollment method was called with the correct enrollment ID
     mock_remove_enrollment.assert_called_once_with(enrollment_id)
+
+
+def test_enroll_users_batch(app, client, seed_user):
+    user, access_token = seed_user
+    with app.app_context():
+        db.session.add(Course(name='Course 1', description='Description 1'))
+        db.session.commit()
+
+    response = client.post(
+        '/enroll/batch',
+        json=[
+            {'user_id': user.id, 'course_id': 1},
+            {'user_id': 99, 'course_id': 1},
+            {'user_id': user.id},
+            {'user_id': True, 'course_id': 1},
+        ],
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    # Partial failures are reported per item with a 207 Multi-Status
+    assert response.status_code == 207
+    assert response.json['created'] == 1
+    assert response.json['failed'] == 3
+    assert [r['status'] for r in response.json['results']] == [201, 404, 400, 400]
+    assert response.json['results'][0]['user_id'] == user.id
+
+
+def test_enroll_users_batch_ndjson(app, client, seed_user):
+    user, access_token = seed_user
+    with app.app_context():
+        db.session.add_all([Course(name='Course 1', description='D1'), Course(name='Course 2', description='D2')])
+        db.session.commit()
+
+    body = '{"user_id": 1, "course_id": 1}\n{"user_id": 1, "course_id": 2}\n'
+    response = client.post(
+        '/enroll/batch',
+        data=body,
+        content_type='application/x-ndjson',
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 201
+    assert [r['course_id'] for r in response.json['results']] == [1, 2]
+
+
+def test_enroll_user_twice_returns_existing_enrollment(app, seed_user):
+    user, access_token = seed_user
+    with app.app_context():
+        db.session.add(Course(name='Course 1', description='Description 1'))
+        db.session.commit()
+
+        first, created = EnrollmentService.enroll_user_in_course(user.id, 1)
+        retry, created_again = EnrollmentService.enroll_user_in_course(user.id, 1)
+
+        assert (created, created_again) == (True, False)
+        assert retry.id == first.id
+        assert len(EnrollmentService.get_enrollments_for_user(user.id)) == 1
+
+
+def test_enroll_users_batch_skips_existing(app, client, seed_user):
+    user, access_token = seed_user
+    with app.app_context():
+        db.session.add(Course(name='Course 1', description='Description 1'))
+        db.session.commit()
+        existing, _ = EnrollmentService.enroll_user_in_course(user.id, 1)
+
+    response = client.post(
+        '/enroll/batch',
+        json=[{'user_id': user.id, 'course_id': 1}, {'user_id': user.id, 'course_id': 1}],
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 201
+    assert [(r['status'], r['id']) for r in response.json['results']] == [(200, existing.id), (200, existing.id)]
+
+
+def test_remove_enrollment_single_delete(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with app.app_context():
+        db.session.add(Course(name='Course 1', description='Description 1'))
+        db.session.commit()
+        enrollment, _ = EnrollmentService.enroll_user_in_course(user.id, 1)
+
+    assert client.delete(f'/enrollments/{enrollment.id}', headers=headers).status_code == 200
+    assert client.delete(f'/enrollments/{enrollment.id}', headers=headers).status_code == 404
+
+
+def test_enroll_unknown_course(client, seed_user):
+    user, access_token = seed_user
+
+    response = client.post(
+        '/enroll',
+        json={'user_id': user.id, 'course_id': 42},
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 404
+
+
+def _seed_enrollments(user_count, course_count):
+    db.session.add_all([User(username=f'user{i}', email=f'user{i}@example.com') for i in range(user_count)])
+    db.session.add_all([Course(name=f'Course {i}', description=f'D{i}') for i in range(course_count)])
+    db.session.flush()
+
+
+def _statements_for(app, client, path, headers):
+    statements = []
+    with app.app_context():
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+    response = client.get(path, headers=headers)
+    with app.app_context():
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return response, len(statements)
+
+
+def test_user_schedule_and_course_roster(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with app.app_context():
+        _seed_enrollments(3, 3)
+        db.session.add_all([Enrollment(user_id=1, course_id=c) for c in (1, 2, 3)])
+        db.session.add_all([Enrollment(user_id=u, course_id=1) for u in (2, 3)])
+        db.session.commit()
+
+    response = client.get('/users/1/courses?limit=2', headers=headers)
+    assert response.status_code == 200
+    assert [e['course'] for e in response.json] == [
+        {'id': 1, 'name': 'Course 0', 'description': 'D0'},
+        {'id': 2, 'name': 'Course 1', 'description': 'D1'},
+    ]
+    assert 'enrollment_date' in response.json[0]
+    assert response.headers['X-Next-Cursor'] == str(response.json[1]['enrollment_id'])
+
+    response = client.get('/courses/1/students', headers=headers)
+    assert [e['student']['username'] for e in response.json] == ['john_doe', 'user0', 'user1']
+
+
+def test_schedule_query_count_is_constant(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with app.app_context():
+        _seed_enrollments(1, 30)
+        db.session.add(Enrollment(user_id=2, course_id=1))
+        db.session.add_all([Enrollment(user_id=1, course_id=c) for c in range(1, 31)])
+        db.session.commit()
+    client.get('/users/1/courses', headers=headers)  # warm the principal cache and blocklist
+
+    small, small_count = _statements_for(app, client, '/users/2/courses', headers)
+    large, large_count = _statements_for(app, client, '/users/1/courses', headers)
+
+    assert (len(small.json), len(large.json)) == (1, 30)
+    assert small_count == large_count == 1
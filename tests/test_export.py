@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from src.extensions import db
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+from src.models.user import User
+
+
+def _seed(app):
+    with app.app_context():
+        db.session.add(User(username='jane_doe', email='jane@example.com'))
+        db.session.add_all([Course(name='Course 1', description='D1'), Course(name='Course, 2', description='D2')])
+        db.session.add_all([
+            Enrollment(user_id=1, course_id=1, enrollment_date=datetime(2024, 9, 1, 9, 30)),
+            Enrollment(user_id=2, course_id=1, enrollment_date=datetime(2024, 9, 2)),
+            Enrollment(user_id=2, course_id=2, enrollment_date=datetime(2024, 9, 5)),
+        ])
+        db.session.commit()
+
+
+def test_export_enrollments_csv(app, client, seed_user):
+    user, access_token = seed_user
+    _seed(app)
+    app.config['API_STREAM_BATCH_SIZE'] = 2
+
+    response = client.get('/export/enrollments', headers={"Authorization": f"Bearer {access_token}"}, buffered=False)
+
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="enrollments.csv"'
+    chunks = list(response.response)
+    assert len(chunks) == 2  # header and first batch, then the second batch
+    rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))
+    assert rows[0] == {
+        'enrollment_id': '1', 'user_id': '1', 'username': 'john_doe', 'email': 'john@example.com',
+        'course_id': '1', 'course_name': 'Course 1', 'enrollment_date': '2024-09-01T09:30:00',
+    }
+    assert [row['course_name'] for row in rows] == ['Course 1', 'Course 1', 'Course, 2']
+
+
+def test_export_enrollments_ndjson_since(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    _seed(app)
+
+    response = client.get('/export/enrollments?format=ndjson&since=2024-09-02', headers=headers)
+
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(r['username'], r['course_name'], r['enrollment_date']) for r in records] == [
+        ('jane_doe', 'Course 1', '2024-09-02T00:00:00'),
+        ('jane_doe', 'Course, 2', '2024-09-05T00:00:00'),
+    ]
+
+    assert client.get('/export/enrollments?format=xml', headers=headers).status_code == 400
+    assert client.get('/export/enrollments?since=soon', headers=headers).status_code == 400
@@ -0,0 +1,72 @@
+import threading
+
+from flask import Response, stream_with_context
+from sqlalchemy import text
+
+from src.extensions import db
+from src.metrics import metrics
+
+
+def test_metrics_records_latency_and_queries(client, seed_user):
+    user, access_token = seed_user
+    client.get('/users', headers={"Authorization": f"Bearer {access_token}"})
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'http_requests_total{endpoint="user_bp.get_users",status="200"} 1' in body
+    assert 'http_request_duration_seconds_count{endpoint="user_bp.get_users"} 1' in body
+    # The first blocklist sync, the user lookup in token_required and the list query
+    assert 'db_queries_total{endpoint="user_bp.get_users"} 3' in body
+    assert 'cache_misses_total{cache="principal"} 1' in body
+
+
+def test_metrics_flags_n_plus_one(client, seed_user):
+    user, access_token = seed_user
+    metrics.n_plus_one_threshold = 1
+
+    client.get('/users', headers={"Authorization": f"Bearer {access_token}"})
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'db_n_plus_one_requests_total{endpoint="user_bp.get_users"} 1' in body
+
+
+def test_batch_sub_requests_are_measured_separately(client, seed_user):
+    user, access_token = seed_user
+
+    client.post('/batch', json=[{'path': '/users'}] * 12, headers={"Authorization": f"Bearer {access_token}"})
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_requests_total{endpoint="user_bp.get_users",status="200"} 12' in body
+    assert 'db_queries_total{endpoint="user_bp.get_users"} 12' in body
+    assert 'db_n_plus_one_requests_total{endpoint="batch_bp.run_batch"} 0' in body
+
+
+def test_streamed_body_is_measured(app, client):
+    @app.route('/stream')
+    def stream():
+        def generate():
+            yield str(db.session.execute(text('SELECT 1')).scalar())
+        return Response(stream_with_context(generate()))
+
+    assert client.get('/stream').data == b'1'
+
+    body = client.get('/metrics').get_data(as_text=True)
+    # The statement ran while the body streamed, after the view had returned
+    assert 'db_queries_total{endpoint="stream"} 1' in body
+
+
+def test_shards_of_finished_threads_are_folded(client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    for _ in range(20):
+        thread = threading.Thread(target=client.get, args=('/users',), kwargs={'headers': headers})
+        thread.start()
+        thread.join()
+
+    assert len(metrics._shards) <= 1
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_requests_total{endpoint="user_bp.get_users",status="200"} 20' in body
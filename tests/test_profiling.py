@@ -0,0 +1,104 @@
+import pstats
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from flask_jwt_extended import create_access_token
+
+from src.app import create_app
+from src.extensions import db
+from src.models.user import User
+from src.profiling import profiler
+
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    def make(**config):
+        app = create_app({
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "PROFILING_ENABLED": True,
+            "PROFILING_DIR": str(tmp_path),
+            "PROFILING_TOKEN": "secret",
+            **config,
+        })
+        with app.app_context():
+            db.create_all()
+            user = User(username="john_doe", email="john@example.com")
+            db.session.add(user)
+            db.session.commit()
+            token = create_access_token(identity=user.id)
+        return app.test_client(), {"Authorization": f"Bearer {token}"}
+    return make
+
+
+def test_request_with_token_header_is_profiled(profiled_app, tmp_path):
+    client, headers = profiled_app()
+
+    response = client.get('/users', headers={**headers, "X-Profile": "secret"})
+
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+    [dump] = tmp_path.glob(f'*-user_bp.get_users-*ms-{profile_id}.pstats')
+    assert pstats.Stats(str(dump)).total_calls > 0
+    sql = dump.with_suffix('.sql').read_text()
+    assert 'GET /users' in sql
+    assert 'FROM user' in sql
+
+
+def test_failed_statement_is_marked_in_sql_file(profiled_app, tmp_path):
+    client, headers = profiled_app()
+
+    @client.application.route('/failing')
+    def failing():
+        with pytest.raises(OperationalError):
+            db.session.execute(text('SELECT * FROM missing'))
+        db.session.rollback()
+        return str(db.session.execute(text('SELECT 1')).scalar())
+
+    assert client.get('/failing', headers={"X-Profile": "secret"}).data == b'1'
+
+    [sql] = tmp_path.glob('*-failing-*.sql')
+    lines = [line for line in sql.read_text().splitlines() if line.startswith('-- ') and 'parameters' in line]
+    assert lines[0].startswith('-- failed;')
+    assert float(lines[1][3:].split(' ms')[0]) < 1000
+
+
+def test_unprofiled_requests_write_nothing(profiled_app, tmp_path):
+    client, headers = profiled_app()
+
+    plain = client.get('/users', headers=headers)
+    wrong_token = client.get('/users', headers={**headers, "X-Profile": "guess"})
+
+    assert 'X-Profile-Id' not in plain.headers
+    assert 'X-Profile-Id' not in wrong_token.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sampled_requests_are_profiled(profiled_app, tmp_path):
+    client, headers = profiled_app(PROFILING_SAMPLE_RATE=1.0, PROFILING_SQL=False)
+
+    response = client.get('/users', headers=headers)
+
+    assert 'X-Profile-Id' in response.headers
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.pstats']
+
+
+def test_one_request_is_profiled_at_a_time(profiled_app, tmp_path):
+    client, headers = profiled_app()
+
+    with profiler._lock:  # another request is being profiled
+        busy = client.get('/users', headers={**headers, "X-Profile": "secret"})
+    after = client.get('/users', headers={**headers, "X-Profile": "secret"})
+
+    assert busy.status_code == 200
+    assert 'X-Profile-Id' not in busy.headers
+    assert 'X-Profile-Id' in after.headers
+
+
+def test_disabled_profiler_registers_no_hooks():
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+
+    hooks = [*app.before_request_funcs.get(None, []), *app.teardown_request_funcs.get(None, [])]
+    assert profiler._before_request not in hooks
+    assert profiler._teardown_request not in hooks
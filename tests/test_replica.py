@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from src import create_app
+from src.extensions import db
+from src.models.user import User
+from src.models.revoked_token import RevokedToken
+from src.routing import REPLICA_BIND, replica_health
+from src.services.user_service import UserService
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+        "REPLICA_DATABASE_URI": f"sqlite:///{tmp_path / 'replica.db'}",
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='john_doe', email='john@example.com'))
+        db.session.commit()
+
+        # Stand in for replication: the replica has the same user plus one it is "ahead" with
+        replica = db.engines[REPLICA_BIND]
+        db.metadata.create_all(replica)
+        with replica.begin() as conn:
+            conn.execute(User.__table__.insert(), [
+                {'username': 'john_doe', 'email': 'john@example.com'},
+                {'username': 'replica_only', 'email': 'replica@example.com'},
+            ])
+    return app
+
+
+def _token(app):
+    with app.app_context():
+        return create_access_token(identity=1)
+
+
+def test_get_requests_read_from_replica(replica_app):
+    client = replica_app.test_client()
+
+    response = client.get('/users', headers={"Authorization": f"Bearer {_token(replica_app)}"})
+
+    assert [u['username'] for u in response.json] == ['john_doe', 'replica_only']
+
+
+def test_reads_after_a_write_use_primary(replica_app):
+    with replica_app.test_request_context('/users', method='GET'):
+        assert len(UserService.get_all_users()) == 2  # replica
+
+        UserService.create_new_user('jane_doe', 'jane@example.com')
+
+        # Read-your-own-writes: the primary has jane_doe, the replica doesn't
+        assert [u.username for u in UserService.get_all_users()] == ['john_doe', 'jane_doe']
+
+    with replica_app.app_context():
+        # Outside requests, only read_only service methods use the replica
+        assert len(UserService.get_all_users()) == 2
+        assert db.session.query(User).count() == 2
+
+
+def test_falls_back_to_primary_when_replica_fails(replica_app):
+    with replica_app.app_context():
+        with db.engines[REPLICA_BIND].begin() as conn:
+            conn.execute(User.__table__.delete())
+            conn.exec_driver_sql('DROP TABLE enrollment')
+            conn.exec_driver_sql('DROP TABLE user')
+
+    client = replica_app.test_client()
+    response = client.get('/users', headers={"Authorization": f"Bearer {_token(replica_app)}"})
+
+    assert response.status_code == 200
+    assert [u['username'] for u in response.json] == ['john_doe']
+    with replica_app.app_context():
+        assert not replica_health.is_available(db.engines[REPLICA_BIND])
+
+
+def test_catalog_cache_is_filled_from_primary(replica_app):
+    client = replica_app.test_client()
+    headers = {"Authorization": f"Bearer {_token(replica_app)}"}
+
+    # The replica lags behind this write
+    assert client.post('/courses', json={'name': 'Course 1', 'description': 'D1'}, headers=headers).status_code == 201
+    assert client.get('/courses?limit=5', headers=headers).json == []
+
+    assert [course['name'] for course in client.get('/courses', headers=headers).json] == ['Course 1']
+
+
+def test_revocations_are_synced_from_primary(replica_app):
+    client = replica_app.test_client()
+    token = _token(replica_app)
+    with replica_app.app_context():
+        # Revoked by another process; the replica has not seen the row yet
+        jti = decode_token(token)['jti']
+        db.session.add(RevokedToken(jti=jti, expires_at=datetime(9999, 1, 1)))
+        db.session.commit()
+
+    response = client.get('/users', headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 401
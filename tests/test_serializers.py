@@ -0,0 +1,26 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+from src.extensions import db
+from src.serializers import Serializer, user_serializer
+from src.models.enrollment import Enrollment
+from src.services.user_service import UserService
+
+
+def test_list_query_returns_rows_not_models(app, seed_user):
+    with app.app_context():
+        users = UserService.get_all_users()
+
+        # Only the serializer's columns are selected and nothing enters the identity map
+        assert tuple(users[0]) == (1, 'john_doe', 'john@example.com')
+        assert len(db.session.identity_map) == 0
+        assert user_serializer.dump_many(users) == [{'id': 1, 'username': 'john_doe', 'email': 'john@example.com'}]
+
+
+def test_dump_objects_and_dates():
+    serializer = Serializer(Enrollment, 'id', 'enrollment_date')
+    enrollment = MagicMock(id=1, enrollment_date=datetime(2024, 9, 1, 8, 30))
+
+    data = serializer.dump_many([enrollment])
+
+    assert data == [{'id': 1, 'enrollment_date': datetime(2024, 9, 1, 8, 30)}]
+    assert serializer.encode(data) == '[{"id":1,"enrollment_date":"2024-09-01T08:30:00"}]'
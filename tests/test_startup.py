@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+# Cold-start budgets for a fresh worker process, generous enough for slow CI machines.
+# Override with STARTUP_IMPORT_BUDGET_MS / STARTUP_CREATE_APP_BUDGET_MS when profiling locally.
+IMPORT_BUDGET_MS = float(os.environ.get('STARTUP_IMPORT_BUDGET_MS', 3000))
+CREATE_APP_BUDGET_MS = float(os.environ.get('STARTUP_CREATE_APP_BUDGET_MS', 1000))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_SCRIPT = """
+import sys, time
+from src import create_app
+start = time.perf_counter()
+create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+print((time.perf_counter() - start) * 1000)
+print(','.join(sorted(sys.modules)))
+"""
+
+
+def _cold_start():
+    """
+    Start the app in a fresh interpreter under `-X importtime`.
+    Returns the import timings (module -> cumulative microseconds), create_app time and loaded modules.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        timings[module.strip()] = int(cumulative)
+
+    create_app_ms, modules = result.stdout.splitlines()[-2:]
+    return timings, float(create_app_ms), set(modules.split(','))
+
+
+def test_startup_within_budget():
+    timings, create_app_ms, modules = _cold_start()
+
+    assert timings['src'] / 1000 < IMPORT_BUDGET_MS
+    assert create_app_ms < CREATE_APP_BUDGET_MS
+    # Test-only modules must not be pulled in by production code
+    assert 'unittest.mock' not in modules
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+from src.extensions import db
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+from src.models.user import User
+from src.services.stats_service import StatsService
+
+
+def _seed(app):
+    with app.app_context():
+        db.session.add_all([User(username='jane_doe', email='jane@example.com'), User(username='sam', email='sam@other.org')])
+        db.session.add_all([Course(name=f'Course {i}', description=f'D{i}') for i in range(1, 4)])
+        db.session.commit()
+
+
+def test_stats_follow_enrollments(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    _seed(app)
+
+    client.post('/enroll', json={'user_id': 1, 'course_id': 1}, headers=headers)
+    client.post('/enroll', json={'user_id': 1, 'course_id': 1}, headers=headers)  # duplicate, not counted
+    client.post('/enroll/batch', json=[
+        {'user_id': 2, 'course_id': 1}, {'user_id': 2, 'course_id': 2},
+        {'user_id': 3, 'course_id': 1}, {'user_id': 3, 'course_id': 3},
+    ], headers=headers)
+
+    response = client.get('/stats/courses', headers=headers)
+    assert response.json == [
+        {'course_id': 1, 'enrollments': 3},
+        {'course_id': 2, 'enrollments': 1},
+        {'course_id': 3, 'enrollments': 1},
+    ]
+    today = datetime.utcnow().date().isoformat()
+    assert client.get('/stats/enrollments/daily', headers=headers).json == [{'day': today, 'enrollments': 5}]
+
+    # Removals, including those done by ON DELETE CASCADE, are counted too
+    client.delete('/enrollments/1', headers=headers)
+    client.delete('/users/3', headers=headers)
+    client.delete('/courses/2', headers=headers)
+
+    assert client.get('/stats/courses', headers=headers).json == [{'course_id': 1, 'enrollments': 1}]
+    assert client.get('/stats/enrollments/daily', headers=headers).json == [{'day': today, 'enrollments': 1}]
+    with app.app_context():
+        assert StatsService.check() == {'courses': [], 'daily': [], 'seats': []}
+
+
+def test_daily_stats_date_range(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    _seed(app)
+    with app.app_context():
+        db.session.add_all([
+            Enrollment(user_id=1, course_id=1, enrollment_date=datetime(2024, 9, 1, 10)),
+            Enrollment(user_id=2, course_id=1, enrollment_date=datetime(2024, 9, 1, 23)),
+            Enrollment(user_id=2, course_id=2, enrollment_date=datetime(2024, 9, 3)),
+        ])
+        db.session.commit()
+        StatsService.rebuild()
+
+    response = client.get('/stats/enrollments/daily?from=2024-09-01&to=2024-09-02', headers=headers)
+    assert response.json == [{'day': '2024-09-01', 'enrollments': 2}]
+    assert client.get('/stats/enrollments/daily?from=yesterday', headers=headers).status_code == 400
+
+
+def test_check_and_rebuild_commands(app, seed_user):
+    _seed(app)
+    with app.app_context():
+        # Written behind EnrollmentService's back, so the summary tables miss it
+        db.session.add(Enrollment(user_id=1, course_id=2, enrollment_date=datetime(2024, 9, 1)))
+        db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['check-enrollment-stats'])
+    assert result.exit_code == 1
+    assert 'course 2: 0 recorded, 1 enrolled' in result.output
+    assert 'day 2024-09-01: 0 recorded, 1 enrolled' in result.output
+
+    assert runner.invoke(args=['rebuild-enrollment-stats']).exit_code == 0
+    assert runner.invoke(args=['check-enrollment-stats']).exit_code == 0
+    with app.app_context():
+        assert StatsService.get_daily_counts() == [(date(2024, 9, 1), 1)]
@@ -55,3 +55,69 @@ def test_create_user(mock_create_new_user, client, seed_user):
 
     # Ensure the create_new_user method was called with the correct data
     mock_create_new_user.assert_called_once_with('jane_doe', 'jane@example.com')
+
+
+def test_get_users_keyset_pagination(app, client, seed_user):
+    user, access_token = seed_user
+    with app.app_context():
+        for i in range(4):
+            UserService.create_new_user(f'user{i}', f'user{i}@example.com')
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    # First page: 2 of the 5 users, with a cursor pointing at the last id returned
+    response = client.get('/users?limit=2', headers=headers)
+    assert response.status_code == 200
+    assert [u['id'] for u in response.json] == [1, 2]
+    assert response.headers['X-Next-Cursor'] == '2'
+    assert 'after=2' in response.headers['Link']
+
+    # Follow the cursor until the last page, which has no next link
+    response = client.get('/users?limit=2&after=4', headers=headers)
+    assert [u['id'] for u in response.json] == [5]
+    assert 'Link' not in response.headers
+
+
+def test_get_users_invalid_page_args(client, seed_user):
+    user, access_token = seed_user
+
+    response = client.get('/users?limit=abc', headers={"Authorization": f"Bearer {access_token}"})
+
+    assert response.status_code == 400
+
+
+def test_get_users_streamed(app, client, seed_user):
+    user, access_token = seed_user
+    with app.app_context():
+        UserService.create_new_user('jane_doe', 'jane@example.com')
+
+    response = client.get('/users?stream=1', headers={"Authorization": f"Bearer {access_token}"})
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.json == [
+        {'id': 1, 'username': 'john_doe', 'email': 'john@example.com'},
+        {'id': 2, 'username': 'jane_doe', 'email': 'jane@example.com'},
+    ]
+
+
+def test_delete_users(app, client, seed_user):
+    user, access_token = seed_user
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with app.app_context():
+        UserService.create_new_user('jane_doe', 'jane@example.org')
+        UserService.create_new_user('jim_doe', 'jim@example.org')
+        UserService.create_new_user('joe_doe', 'joe@example.com')
+
+    response = client.delete('/users?email_domain=example.org', headers=headers)
+    assert response.json == {'deleted': 2, 'ids': [2, 3]}
+
+    # true would otherwise be taken as id 1
+    assert client.delete('/users', json={'ids': [True]}, headers=headers).status_code == 400
+
+    response = client.delete('/users', json={'ids': [4, 99]}, headers=headers)
+    assert response.json == {'deleted': 1, 'ids': [4]}
+
+    # Deleting yourself also drops the cached principal, so the token stops working
+    assert client.delete(f'/users/{user.id}', headers=headers).status_code == 200
+    assert client.get('/users', headers=headers).status_code == 403
@@ -0,0 +1,63 @@
+import threading
+import pytest
+from src import create_app
+from src.extensions import db
+from src.models.user import User
+from src.models.course import Course
+from src.models.enrollment import Enrollment
+from src.services.enrollment_service import EnrollmentService
+from src.services.write_queue import write_queue
+
+
+@pytest.fixture
+def group_commit_app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+        "ENROLLMENT_GROUP_COMMIT": True,
+        "GROUP_COMMIT_MAX_WAIT_MS": 50,
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([User(username=f'user{i}', email=f'user{i}@example.com') for i in range(20)])
+        db.session.add(Course(name='Course 1', description='Description 1'))
+        db.session.commit()
+
+    yield app
+
+    write_queue.stop()
+
+
+def test_concurrent_enrollments_share_commits(group_commit_app):
+    results = {}
+
+    def enroll(user_id):
+        with group_commit_app.app_context():
+            results[user_id], _ = EnrollmentService.enroll_user_in_course(user_id, 1)
+
+    threads = [threading.Thread(target=enroll, args=(user_id,)) for user_id in range(1, 21)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every caller got its own enrollment back, but far fewer than 20 commits were made
+    assert sorted(row.user_id for row in results.values()) == list(range(1, 21))
+    assert write_queue.commits < 20
+    with group_commit_app.app_context():
+        assert db.session.query(Enrollment).count() == 20
+
+
+def test_failed_operation_only_fails_its_caller(group_commit_app):
+    def fail():
+        raise ValueError('bad write')
+
+    with group_commit_app.app_context():
+        failing = write_queue.submit(fail)
+        succeeding = write_queue.submit(EnrollmentService._enroll, 1, 1)
+
+        with pytest.raises(ValueError):
+            failing.result(timeout=5)
+        enrollment, created = succeeding.result(timeout=5)
+        assert (enrollment.user_id, created) == (1, True)
+        assert db.session.query(Enrollment).count() == 1